@@ -0,0 +1,176 @@
+"""
+Benchmark: peak memory of the Silver dedup/write and Gold aggregation steps,
+in memory vs. out of core, as the history grows.
+
+Cleaned synthetic trips (a fixed number per month) are generated for a
+growing number of months. For each size and mode, each step runs in a fresh
+process (in a scratch directory), and its peak RSS is reported, together
+with the largest RSS sampled from a month worker (Linux, read from /proc).
+In memory, peak RSS grows with the history; out of core the workers stay at
+about one month each. No MongoDB is needed.
+
+Usage:
+    uv run python -m benchmarks.bench_out_of_core --rows-per-month 500000 --months 2 4 8
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import polars as pl
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+INPUT_DIR = "bench_input"  # Cleaned batches, one Parquet file each (inside the scratch directory)
+
+
+def generate(workdir, months, rows_per_month):
+    """
+    Writes cleaned synthetic batches covering `months` months to workdir/INPUT_DIR,
+    in the batch size Silver reads Bronze with.
+    """
+    from src.clean import READ_BATCH_SIZE, validate_batch
+    from src.schemas import RAW_SCHEMA, conform
+    from src.synthetic import iter_trip_batches
+
+    target = os.path.join(workdir, INPUT_DIR)
+    os.makedirs(target)
+    batches = iter_trip_batches(months * rows_per_month, start=datetime(2022, 1, 1), days=months * 30,
+                                batch_size=READ_BATCH_SIZE)
+    for i, batch in enumerate(batches):
+        valid, _ = validate_batch(conform(batch, RAW_SCHEMA, strict=False))
+        valid.write_parquet(os.path.join(target, f"batch-{i:05d}.parquet"))
+
+def run_silver(out_of_core):
+    """
+    Deduplicates the cleaned batches and writes the Silver dataset.
+    """
+    from src.clean import _finish_month, _write_month
+    from src.out_of_core import map_months, reset_staging, stage_batch, staged_months
+    from src.silver_store import write_silver
+
+    files = sorted(os.path.join(INPUT_DIR, f) for f in os.listdir(INPUT_DIR))
+    if out_of_core:
+        reset_staging()
+        for path in files:
+            stage_batch(pl.read_parquet(path))
+        staged = [r["path"] for r in map_months(_finish_month, staged_months(), batch_id="bench")]
+        map_months(_write_month, staged, mode="append")
+    else:
+        df = pl.concat([pl.read_parquet(p) for p in files]).unique(subset=["trip_id"])
+        write_silver(df.with_columns(pl.lit("bench").alias("silver_batch")), mode="overwrite")
+
+def run_gold(out_of_core):
+    """
+    Computes every Gold metric, partial state and sketch over the Silver dataset.
+    """
+    from src.aggregate import GOLD_METRICS, PARTIAL_STATES, partial_aggregates, _compute_by_month
+    from src.sketch import SKETCH_DIMENSIONS, sketch_partials
+    from src.silver_store import scan_silver
+
+    silver = scan_silver()
+    if out_of_core:
+        _compute_by_month(silver, None, None)
+    else:
+        pl.collect_all(
+            [m.build(silver) for m in GOLD_METRICS]
+            + [partial_aggregates(silver, s) for s in PARTIAL_STATES]
+            + [sketch_partials(silver, d) for d in SKETCH_DIMENSIONS]
+        )
+
+def _status_mb(pid, field):
+    """
+    Reads a memory field (e.g. VmHWM, the peak RSS) from /proc/<pid>/status in MB.
+    ru_maxrss is not used: it carries over from the parent across fork and exec.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return 0.0
+
+def _child_pids(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                        children.append(int(entry))
+            except (FileNotFoundError, ProcessLookupError, IndexError):
+                continue
+    return children
+
+def worker(step, out_of_core):
+    """
+    Entry point of the measured subprocess: runs one step and prints its peak
+    RSS and the largest RSS sampled from its month workers.
+    """
+    peak_worker = [0.0]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.05):
+            for pid in _child_pids(os.getpid()):
+                peak_worker[0] = max(peak_worker[0], _status_mb(pid, "VmRSS"))
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    (run_silver if step == "silver" else run_gold)(out_of_core)
+    elapsed = time.perf_counter() - started
+    done.set()
+    sampler.join()
+    print(json.dumps({
+        "seconds": elapsed,
+        "rss_mb": _status_mb(os.getpid(), "VmHWM"),
+        "worker_rss_mb": peak_worker[0],
+    }))
+
+def measure(workdir, step, out_of_core):
+    command = [sys.executable, os.path.abspath(__file__), "--worker", step]
+    if out_of_core:
+        command.append("--out-of-core")
+    output = subprocess.run(command, cwd=workdir, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows-per-month", type=int, default=500_000)
+    parser.add_argument("--months", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--worker", choices=["silver", "gold"], help=argparse.SUPPRESS)
+    parser.add_argument("--out-of-core", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.out_of_core)
+        return
+
+    rows = []
+    for months in args.months:
+        with tempfile.TemporaryDirectory() as workdir:
+            logger.info(f"Generating {months} months x {args.rows_per_month} trips...")
+            generate(workdir, months, args.rows_per_month)
+            for out_of_core in (False, True):
+                for step in ("silver", "gold"):
+                    result = measure(workdir, step, out_of_core)
+                    rows.append((months, "out-of-core" if out_of_core else "in-memory", step, result))
+
+    logger.info(f"{'months':>6} {'mode':<12}{'step':<8}{'peak RSS MB':>12}{'worker MB':>11}{'seconds':>9}")
+    for months, mode, step, r in rows:
+        worker_mb = f"{r['worker_rss_mb']:.0f}" if mode == "out-of-core" else "-"
+        logger.info(f"{months:>6} {mode:<12}{step:<8}{r['rss_mb']:>12.0f}{worker_mb:>11}{r['seconds']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
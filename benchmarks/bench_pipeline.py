@@ -0,0 +1,252 @@
+"""
+Benchmark: end-to-end download, ingest, clean and aggregate on synthetic trips.
+
+A synthetic CSV (src/synthetic.py) is served by a local HTTP server standing
+in for the Socrata portal, and the pipeline DAG runs against a throwaway
+MongoDB: a local `mongod` started from PATH (default), in-process mongomock
+(if installed), or an existing server via --mongo-uri (a scratch database is used).
+Each stage's throughput and peak memory are compared with the stored
+baseline; the run fails (exit code 1) on a regression beyond --threshold.
+
+Usage:
+    uv run python -m benchmarks.bench_pipeline --rows 1000000
+    uv run python -m benchmarks.bench_pipeline --rows 1000000 --update-baseline
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pymongo import MongoClient
+
+try:
+    import mongomock
+    HAS_MONGOMOCK = True
+except ImportError:
+    HAS_MONGOMOCK = False
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+THRESHOLD = 0.20  # Allowed throughput drop / memory growth before failing
+BENCH_DB = "chicago_transit_bench"
+PIPELINE_MODULES = ("src.indexes", "src.ingest", "src.clean", "src.aggregate", "src.dag", "src.metrics")
+
+
+# ----------------------------------------------------------------
+# LOCAL STAND-INS
+# ----------------------------------------------------------------
+def serve_csv(path):
+    """
+    Serves one CSV file for every GET, like the portal's resource endpoint.
+    Returns:
+        tuple[ThreadingHTTPServer, str]: The running server and its URL.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(os.path.getsize(path)))
+            self.end_headers()
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile, 1024 * 1024)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/resource.csv"
+
+def start_mongod(workdir):
+    """
+    Starts a throwaway mongod on a free port.
+    Returns:
+        tuple[subprocess.Popen, str]: The process and its connection URI.
+    """
+    binary = shutil.which("mongod")
+    if binary is None:
+        raise RuntimeError("mongod not found on PATH; use --backend mongomock or --mongo-uri")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    dbpath = os.path.join(workdir, "mongod")
+    os.makedirs(dbpath)
+    process = subprocess.Popen(
+        [binary, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    uri = f"mongodb://127.0.0.1:{port}/"
+    deadline = time.time() + 30
+    while True:
+        try:
+            MongoClient(uri, serverSelectionTimeoutMS=500).admin.command("ping")
+            return process, uri
+        except Exception:
+            if time.time() > deadline or process.poll() is not None:
+                process.terminate()
+                raise RuntimeError("mongod did not start")
+            time.sleep(0.2)
+
+def use_mongomock():
+    """
+    Points every pipeline module at one shared in-process mongomock client.
+    mongomock does not implement find_raw_batches, so it is emulated with BSON
+    encoding. Its inserts are slow on indexed collections, so keep --rows small.
+    """
+    import bson
+    from importlib import import_module
+    from mongomock.collection import Collection
+
+    def find_raw_batches(self, filter=None, projection=None, batch_size=0, **kwargs):
+        docs = list(self.find(filter or {}, projection, **kwargs))
+        step = batch_size or 101
+        for i in range(0, len(docs), step):
+            yield b"".join(bson.encode(d) for d in docs[i:i + step])
+    Collection.find_raw_batches = find_raw_batches
+
+    client = mongomock.MongoClient()
+    for name in PIPELINE_MODULES:
+        import_module(name).MongoClient = lambda *args, **kwargs: client
+    return client
+
+
+# ----------------------------------------------------------------
+# BASELINE COMPARISON
+# ----------------------------------------------------------------
+def summarize_run(run, rows, backend):
+    run_doc = run.to_dict()
+    return {
+        "rows": rows,
+        "backend": backend,
+        "total": {"wall_s": run_doc["wall_s"], "rows_per_s": round(rows / run_doc["wall_s"], 1)},
+        "stages": {
+            s["stage"]: {"wall_s": s["wall_s"], "rows_per_s": s["rows_per_s"], "peak_rss_mb": s["peak_rss_mb"]}
+            for s in run_doc["stages"]
+        },
+    }
+
+def find_regressions(result, baseline, threshold=THRESHOLD):
+    """
+    Lists stages whose throughput fell, or whose peak RSS grew, by more than threshold.
+    """
+    regressions = []
+    current = dict(result["stages"], total=result["total"])
+    for stage, base in dict(baseline["stages"], total=baseline["total"]).items():
+        now = current.get(stage)
+        if now is None:
+            continue
+        if base.get("rows_per_s") and now.get("rows_per_s") is not None \
+                and now["rows_per_s"] < base["rows_per_s"] * (1 - threshold):
+            regressions.append(f"{stage}: {now['rows_per_s']:,.0f} rows/s vs baseline {base['rows_per_s']:,.0f}")
+        if base.get("peak_rss_mb") and now.get("peak_rss_mb") \
+                and now["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{stage}: peak RSS {now['peak_rss_mb']:.0f} MB vs baseline {base['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic rows (duplicates included)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duplicate-rate", type=float, default=0.01)
+    parser.add_argument("--dirty-rate", type=float, default=0.02)
+    parser.add_argument("--backend", choices=["mongod", "mongomock"], default="mongod")
+    parser.add_argument("--mongo-uri", help="Use an existing server (scratch database) instead")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    project_root = os.getcwd()
+    mongod = None
+    server = None
+    try:
+        # Relative data/ paths of the pipeline now resolve inside the scratch directory
+        os.chdir(workdir)
+        from src.synthetic import write_trips_csv
+        csv_path = write_trips_csv(args.rows, os.path.join(workdir, "synthetic.csv"), seed=args.seed,
+                                   duplicate_rate=args.duplicate_rate, dirty_rate=args.dirty_rate)
+        server, url = serve_csv(csv_path)
+
+        backend = "uri" if args.mongo_uri else args.backend
+        if backend == "mongod":
+            mongod, os.environ["MONGO_URI"] = start_mongod(workdir)
+        elif args.mongo_uri:
+            os.environ["MONGO_URI"] = args.mongo_uri
+        os.environ["SOCRATA_URL"] = url
+
+        # Imported only now: connection settings are read at import time
+        from importlib import import_module
+        from src.dag import run_dag
+        from src.metrics import pipeline_run
+        from src.pipeline import build_stages
+        if backend == "mongomock":
+            if not HAS_MONGOMOCK:
+                raise RuntimeError("mongomock is not installed (pip install mongomock)")
+            client = use_mongomock()
+        else:
+            client = MongoClient(os.environ["MONGO_URI"])
+        for name in PIPELINE_MODULES:
+            import_module(name).DB_NAME = BENCH_DB
+        client.drop_database(BENCH_DB)
+
+        logger.info(f"Running the pipeline on {args.rows:,} synthetic rows ({backend})...")
+        with pipeline_run(db=client[BENCH_DB]) as run:
+            status = run_dag(build_stages(), state_file=os.path.join(workdir, "dag_state.json"), force=True)
+        if any(s != "ran" for s in status.values()):
+            logger.error(f"Benchmark run did not complete: {status}")
+            return 1
+        if backend != "mongomock":
+            client.drop_database(BENCH_DB)
+    finally:
+        os.chdir(project_root)
+        if server is not None:
+            server.shutdown()
+        if mongod is not None:
+            mongod.terminate()
+            mongod.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = summarize_run(run, args.rows, backend)
+    for stage, m in dict(result["stages"], total=result["total"]).items():
+        rate = f"{m['rows_per_s']:>12,.0f} rows/s" if m.get("rows_per_s") else f"{'n/a':>12} rows/s"
+        rss = f"peak RSS {m['peak_rss_mb']:7.0f} MB" if "peak_rss_mb" in m else ""
+        logger.info(f"{stage:<16} {m['wall_s']:8.2f} s {rate}  {rss}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        logger.info(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        logger.warning(f"No baseline at {args.baseline}; rerun with --update-baseline to store one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if (baseline["rows"], baseline["backend"]) != (result["rows"], result["backend"]):
+        logger.warning(f"Baseline was recorded with {baseline['rows']:,} rows on {baseline['backend']}; "
+                       "not comparable, skipping the regression check.")
+        return 0
+
+    regressions = find_regressions(result, baseline, args.threshold)
+    for line in regressions:
+        logger.error(f"REGRESSION {line}")
+    if regressions:
+        return 1
+    logger.info(f"No regressions beyond {args.threshold:.0%} against the baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Benchmark: memory, Parquet size and Gold group-by time of Silver with the
+compact registry types (src/schemas.py) vs. the previously inferred types.
+
+The "inferred" frame is the same cleaned rows with the types the pipeline
+used before the registry: labels and ids as String, community areas as
+Int64 and trip_seconds as Float64. No MongoDB is needed.
+
+Usage:
+    uv run python -m benchmarks.bench_schemas --rows 1000000
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import polars as pl
+from src.aggregate import GOLD_METRICS, PARTIAL_STATES, partial_aggregates
+from src.clean import validate_batch
+from src.schemas import RAW_SCHEMA, conform
+from src.synthetic import iter_trip_batches
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+
+def inferred_types(df):
+    """
+    Casts compact Silver columns back to the types they had when inferred.
+    """
+    return df.with_columns(
+        pl.col(pl.Categorical).cast(pl.String),
+        pl.col("pickup_community_area", "dropoff_community_area").cast(pl.Int64),
+        pl.col("trip_seconds").cast(pl.Float64),
+    )
+
+def time_gold(df, runs):
+    """
+    Median time to run every Gold metric and partial state over the frame.
+    """
+    silver = df.lazy()
+    queries = [m.build(silver) for m in GOLD_METRICS] + [partial_aggregates(silver, s) for s in PARTIAL_STATES]
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        pl.collect_all(queries)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def parquet_mb(df, directory, name):
+    path = os.path.join(directory, f"{name}.parquet")
+    df.write_parquet(path)
+    return os.path.getsize(path) / 1024 ** 2
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5, help="Timed Gold runs per variant")
+    args = parser.parse_args()
+
+    logger.info(f"Cleaning {args.rows} synthetic trips...")
+    compact = pl.concat([
+        validate_batch(conform(batch, RAW_SCHEMA, strict=False))[0]
+        for batch in iter_trip_batches(args.rows)
+    ])
+    inferred = inferred_types(compact)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, df in (("inferred", inferred), ("compact", compact)):
+            results[name] = (df.estimated_size() / 1024 ** 2, parquet_mb(df, tmp, name), time_gold(df, args.runs))
+
+    logger.info(f"{len(compact)} Silver rows")
+    logger.info(f"{'':<10}{'memory MB':>12}{'parquet MB':>12}{'gold ms':>10}")
+    for name, (memory, size, gold) in results.items():
+        logger.info(f"{name:<10}{memory:>12.1f}{size:>12.1f}{gold:>10.0f}")
+    before, after = results["inferred"], results["compact"]
+    logger.info("Change: memory {:+.0%}, parquet {:+.0%}, gold {:+.0%}".format(
+        *(a / b - 1 for a, b in zip(after, before))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
+import logging
+import os
+import threading
+
+# --- LOGGING SETUP ---
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+# --- CONFIGURATION ---
+WRITE_WORKERS = int(os.getenv("MONGO_WRITE_WORKERS", "4"))
+WRITE_BATCH_SIZE = int(os.getenv("MONGO_WRITE_BATCH_SIZE", "10000"))
+# Batches queued or in flight before producers block (backpressure)
+MAX_PENDING_BATCHES = int(os.getenv("MONGO_WRITE_MAX_PENDING", str(2 * WRITE_WORKERS)))
+# e.g. "1", "majority" or "0"; unset keeps the client's default write concern
+WRITE_CONCERN = os.getenv("MONGO_WRITE_CONCERN")
+DUPLICATE_KEY = 11000
+
+
+def parse_write_concern(value):
+    """
+    Turns "majority" / "1" style settings into a WriteConcern (None if unset).
+    """
+    if value is None or isinstance(value, WriteConcern):
+        return value
+    return WriteConcern(w=int(value) if str(value).isdigit() else value)
+
+
+class WriteResult:
+    """
+    Totals over every batch a BulkWriter issued.
+    """
+    def __init__(self):
+        self.batches = 0
+        self.inserted = 0
+        self.upserted = 0
+        self.modified = 0
+        self.duplicates = 0
+        self.errors = 0
+
+    def __repr__(self):
+        return (f"WriteResult(batches={self.batches}, inserted={self.inserted}, upserted={self.upserted}, "
+                f"modified={self.modified}, duplicates={self.duplicates}, errors={self.errors})")
+
+
+class BulkWriter:
+    """
+    Writes to one collection from a bounded thread pool. Batches are encoded
+    (DataFrame -> documents) on the worker threads and sent as unordered
+    insert_many / bulk_write calls; once `max_pending` batches are queued,
+    the producer blocks until a worker finishes one.
+
+    Use as a context manager; leaving the block waits for every batch:
+
+        with BulkWriter(collection) as writer:
+            for batch in frames:
+                writer.write_frame(batch)
+        writer.result.inserted
+
+    Args:
+        collection: Target pymongo collection.
+        batch_size (int): Documents per request.
+        workers (int): Concurrent requests.
+        max_pending (int): Batches queued or in flight before write_* blocks.
+        write_concern (WriteConcern | str | None): Overrides the collection's.
+        ignore_duplicates (bool): Count duplicate-key errors (code 11000)
+            instead of failing, e.g. for re-delivered trips.
+    Raises:
+        BulkWriteError: On exit, if any batch had a non-duplicate write error
+        (after all batches finished, so the counts are complete).
+    """
+    def __init__(self, collection, batch_size=WRITE_BATCH_SIZE, workers=WRITE_WORKERS,
+                 max_pending=MAX_PENDING_BATCHES, write_concern=WRITE_CONCERN, ignore_duplicates=False):
+        write_concern = parse_write_concern(write_concern)
+        if write_concern is not None:
+            collection = collection.with_options(write_concern=write_concern)
+        self.collection = collection
+        self.batch_size = batch_size
+        self.ignore_duplicates = ignore_duplicates
+        self.result = WriteResult()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-writer")
+        self._slots = threading.BoundedSemaphore(max(max_pending, workers))
+        self._lock = threading.Lock()
+        self._futures = []
+        self._failures = []
+
+    # --- producers ---
+    def write_frame(self, df):
+        """
+        Queues a Polars DataFrame, split into batch_size slices.
+        """
+        for offset in range(0, len(df), self.batch_size):
+            self._submit(self._insert_frame, df.slice(offset, self.batch_size))
+
+    def write_frames(self, frames):
+        for df in frames:
+            self.write_frame(df)
+
+    def write_records(self, records):
+        """
+        Queues a list of documents, split into batch_size slices.
+        """
+        for offset in range(0, len(records), self.batch_size):
+            self._submit(self._insert, records[offset:offset + self.batch_size])
+
+    def write_ops(self, ops):
+        """
+        Queues bulk_write operations (UpdateOne, ReplaceOne, ...), split into batch_size slices.
+        """
+        for offset in range(0, len(ops), self.batch_size):
+            self._submit(self._bulk_write, ops[offset:offset + self.batch_size])
+
+    def _submit(self, fn, batch):
+        self._slots.acquire()
+        # Carry the caller's context so Mongo latency is attributed to its stage
+        context = copy_context()
+        try:
+            future = self._pool.submit(context.run, fn, batch)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    # --- workers ---
+    def _insert_frame(self, df):
+        self._insert(df.to_dicts())
+
+    def _insert(self, docs):
+        try:
+            inserted = len(self.collection.insert_many(docs, ordered=False).inserted_ids)
+            self._add(inserted=inserted)
+        except BulkWriteError as e:
+            self._add_failure(e)
+
+    def _bulk_write(self, ops):
+        try:
+            res = self.collection.bulk_write(ops, ordered=False)
+            self._add(inserted=res.inserted_count, upserted=res.upserted_count, modified=res.modified_count)
+        except BulkWriteError as e:
+            self._add_failure(e)
+
+    def _add(self, inserted=0, upserted=0, modified=0, duplicates=0, errors=0):
+        with self._lock:
+            r = self.result
+            r.batches += 1
+            r.inserted += inserted
+            r.upserted += upserted
+            r.modified += modified
+            r.duplicates += duplicates
+            r.errors += errors
+
+    def _add_failure(self, e):
+        details = e.details
+        write_errors = details.get("writeErrors", [])
+        duplicates = sum(1 for err in write_errors if err.get("code") == DUPLICATE_KEY)
+        if not self.ignore_duplicates:
+            duplicates = 0
+        self._add(inserted=details.get("nInserted", 0), upserted=details.get("nUpserted", 0),
+                  modified=details.get("nModified", 0), duplicates=duplicates,
+                  errors=len(write_errors) - duplicates)
+        if len(write_errors) > duplicates or details.get("writeConcernErrors"):
+            with self._lock:
+                self._failures.append(e)
+
+    # --- completion ---
+    def close(self):
+        """
+        Waits for every queued batch and returns the totals.
+        """
+        try:
+            wait(self._futures)
+        finally:
+            self._pool.shutdown(wait=True)
+        for future in self._futures:
+            # Anything but a write error (e.g. connection loss) fails the writer outright
+            if future.exception() is not None:
+                raise future.exception()
+        if self.result.duplicates:
+            logger.warning(f"Skipped {self.result.duplicates} duplicate documents already in "
+                           f"'{self.collection.name}'.")
+        if self._failures:
+            logger.error(f"Bulk write to '{self.collection.name}' failed: {self.result}")
+            raise self._failures[0]
+        return self.result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            # The producer failed: drop what has not started, let running batches finish
+            for future in self._futures:
+                future.cancel()
+            self._pool.shutdown(wait=True)
+            return False
+        self.close()
+        return False
+
+
+def bulk_insert(collection, data, **kwargs):
+    """
+    Inserts a DataFrame, a list of documents or an iterable of DataFrames
+    with a BulkWriter (see there for the options).
+    Returns:
+        WriteResult: Insert and error counts.
+    """
+    with BulkWriter(collection, **kwargs) as writer:
+        if isinstance(data, list):
+            writer.write_records(data)
+        elif hasattr(data, "to_dicts"):
+            writer.write_frame(data)
+        else:
+            writer.write_frames(data)
+    return writer.result
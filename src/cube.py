@@ -0,0 +1,164 @@
+from datetime import datetime, time, timedelta
+
+# --- CONFIGURATION ---
+CUBE_COLLECTION = "gold_cube"
+SILVER_COLLECTION = "silver_trips"
+TOP_AREAS = 10
+
+AVG_FIELDS = ("avg_fare", "avg_duration", "avg_cost")
+
+
+def _avg(measure):
+    """
+    Mean of a measure from summed partials; null when no values were counted.
+    """
+    return {"$cond": [
+        {"$gt": [f"${measure}_n", 0]},
+        {"$divide": [f"${measure}_sum", f"${measure}_n"]},
+        None,
+    ]}
+
+def _rounded(views):
+    """
+    Rounds averages to cents like the Gold views (done client-side on the
+    few result rows rather than per group on the server).
+    """
+    for rows in views.values():
+        for row in rows:
+            for field in AVG_FIELDS:
+                if row.get(field) is not None:
+                    row[field] = round(row[field], 2)
+    return views
+
+def _cube_match(start=None, end=None, companies=None, payment_types=None, areas=None):
+    """
+    Builds the $match stage for a filter combination. Empty filters are left
+    out so the most selective compound index can be used.
+    """
+    match = {}
+    if start is not None or end is not None:
+        match["date"] = {}
+        if start is not None:
+            match["date"]["$gte"] = start.isoformat()
+        if end is not None:
+            match["date"]["$lte"] = end.isoformat()
+    if companies:
+        match["company"] = {"$in": list(companies)}
+    if payment_types:
+        match["payment_type"] = {"$in": list(payment_types)}
+    if areas:
+        match["pickup_community_area"] = {"$in": list(areas)}
+    return match
+
+def query_cube(db, start=None, end=None, companies=None, payment_types=None, areas=None):
+    """
+    Answers the dashboard views for any filter combination from the cube.
+    All three views come back from one round trip through $facet.
+    Args:
+        start (date): Inclusive first trip date.
+        end (date): Inclusive last trip date.
+        companies, payment_types, areas (list): Optional equality filters.
+    Returns:
+        dict: "hourly", "payment" and "area" lists shaped like the Gold views.
+    """
+    match = _cube_match(start, end, companies, payment_types, areas)
+    pipeline = [
+        {"$match": match},
+        {"$facet": {
+            "hourly": [
+                {"$group": {
+                    "_id": "$hour",
+                    "trip_count": {"$sum": "$trip_count"},
+                    "fare_sum": {"$sum": "$fare_sum"}, "fare_n": {"$sum": "$fare_n"},
+                    "duration_min_sum": {"$sum": "$duration_min_sum"},
+                    "duration_min_n": {"$sum": "$duration_min_n"},
+                }},
+                {"$project": {"_id": 0, "hour": "$_id", "trip_count": 1,
+                              "avg_fare": _avg("fare"), "avg_duration": _avg("duration_min")}},
+                {"$sort": {"hour": 1}},
+            ],
+            "payment": [
+                {"$group": {
+                    "_id": "$payment_type",
+                    "count": {"$sum": "$trip_count"},
+                    "trip_total_sum": {"$sum": "$trip_total_sum"},
+                    "trip_total_n": {"$sum": "$trip_total_n"},
+                }},
+                {"$project": {"_id": 0, "payment_type": "$_id", "count": 1,
+                              "avg_cost": _avg("trip_total")}},
+                {"$sort": {"count": -1}},
+            ],
+            "area": [
+                {"$group": {
+                    "_id": "$pickup_community_area",
+                    "trip_count": {"$sum": "$trip_count"},
+                    "fare_sum": {"$sum": "$fare_sum"}, "fare_n": {"$sum": "$fare_n"},
+                }},
+                {"$project": {"_id": 0, "pickup_community_area": "$_id", "trip_count": 1,
+                              "avg_fare": _avg("fare")}},
+                {"$sort": {"trip_count": -1}},
+                {"$limit": TOP_AREAS},
+            ],
+        }},
+    ]
+    return _rounded(next(db[CUBE_COLLECTION].aggregate(pipeline)))
+
+def query_silver(db, start=None, end=None, companies=None, payment_types=None, areas=None):
+    """
+    The same views computed by scanning silver_trips directly.
+    Used as the baseline in benchmarks/bench_cube.py.
+    """
+    match = _cube_match(None, None, companies, payment_types, areas)
+    if start is not None or end is not None:
+        match["trip_start_timestamp"] = {}
+        if start is not None:
+            match["trip_start_timestamp"]["$gte"] = datetime.combine(start, time.min)
+        if end is not None:
+            match["trip_start_timestamp"]["$lt"] = datetime.combine(end + timedelta(days=1), time.min)
+    pipeline = [
+        {"$match": match},
+        {"$facet": {
+            "hourly": [
+                {"$group": {"_id": {"$hour": "$trip_start_timestamp"},
+                            "trip_count": {"$sum": 1},
+                            "avg_fare": {"$avg": "$fare"},
+                            "avg_duration": {"$avg": "$duration_min"}}},
+                {"$project": {"_id": 0, "hour": "$_id", "trip_count": 1,
+                              "avg_fare": 1,
+                              "avg_duration": 1}},
+                {"$sort": {"hour": 1}},
+            ],
+            "payment": [
+                {"$group": {"_id": "$payment_type", "count": {"$sum": 1},
+                            "avg_cost": {"$avg": "$trip_total"}}},
+                {"$project": {"_id": 0, "payment_type": "$_id", "count": 1,
+                              "avg_cost": 1}},
+                {"$sort": {"count": -1}},
+            ],
+            "area": [
+                {"$group": {"_id": "$pickup_community_area", "trip_count": {"$sum": 1},
+                            "avg_fare": {"$avg": "$fare"}}},
+                {"$project": {"_id": 0, "pickup_community_area": "$_id", "trip_count": 1,
+                              "avg_fare": 1}},
+                {"$sort": {"trip_count": -1}},
+                {"$limit": TOP_AREAS},
+            ],
+        }},
+    ]
+    return _rounded(next(db[SILVER_COLLECTION].aggregate(pipeline)))
+
+def cube_dimensions(db):
+    """
+    Returns the filter choices available in the cube (date bounds and
+    distinct values of each categorical dimension).
+    """
+    cube = db[CUBE_COLLECTION]
+    first = cube.find_one({}, {"date": 1}, sort=[("date", 1)])
+    last = cube.find_one({}, {"date": 1}, sort=[("date", -1)])
+    return {
+        "min_date": first["date"] if first else None,
+        "max_date": last["date"] if last else None,
+        "companies": sorted(c for c in cube.distinct("company") if c is not None),
+        "payment_types": sorted(p for p in cube.distinct("payment_type") if p is not None),
+        "areas": sorted(a for a in cube.distinct("pickup_community_area") if a is not None),
+    }
@@ -0,0 +1,133 @@
+import numpy as np
+import polars as pl
+import hashlib
+import logging
+import os
+import shutil
+
+# --- LOGGING SETUP ---
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+# --- CONFIGURATION ---
+# Stored next to the Silver dataset: <TRIP_ID_SET_DIR>/bucket-XXX.parquet
+TRIP_ID_SET_DIR = "data/processed/trip_id_set"
+# Buckets by the top bits of the hash; only the buckets a batch touches are
+# loaded, one at a time, so memory stays at ~1/NUM_BUCKETS of the history
+NUM_BUCKETS = 256
+BUCKET_SHIFT = 64 - 8  # log2(NUM_BUCKETS) top bits
+
+
+def hash_ids(ids):
+    """
+    Hashes trip_ids to 64-bit integers with blake2b. Unlike Polars' hash,
+    the result is stable across versions and processes, so it can be stored.
+    At 100 million ids the chance of any collision is below 1 in 3,000.
+    Returns:
+        np.ndarray: uint64 hashes, one per id.
+    """
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(i.encode(), digest_size=8).digest(), "little") for i in ids),
+        dtype=np.uint64, count=len(ids),
+    )
+
+
+class TripIdSet:
+    """
+    Persistent, compact membership set of every trip_id loaded into Silver:
+    8 bytes per trip, kept as sorted uint64 hashes in NUM_BUCKETS Parquet files.
+    Lookups binary-search one bucket at a time, so deduplicating a batch
+    against all history needs memory proportional to the batch, not the history.
+    """
+    def __init__(self, root=TRIP_ID_SET_DIR):
+        self.root = root
+
+    def exists(self):
+        return os.path.isdir(self.root)
+
+    def _path(self, bucket):
+        return os.path.join(self.root, f"bucket-{bucket:03d}.parquet")
+
+    def _load(self, bucket):
+        path = self._path(bucket)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=np.uint64)
+        return pl.read_parquet(path)["h"].to_numpy()
+
+    def _save(self, bucket, hashes):
+        path = self._path(bucket)
+        tmp_path = f"{path}.tmp"
+        pl.DataFrame({"h": pl.Series(hashes, dtype=pl.UInt64)}).write_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _by_bucket(hashes):
+        buckets = (hashes >> np.uint64(BUCKET_SHIFT)).astype(np.int64)
+        order = np.argsort(buckets, kind="stable")
+        bounds = np.searchsorted(buckets[order], np.arange(NUM_BUCKETS + 1))
+        for bucket in range(NUM_BUCKETS):
+            start, end = bounds[bucket], bounds[bucket + 1]
+            if start < end:
+                yield bucket, order[start:end]
+
+    def contains(self, ids):
+        """
+        Returns a boolean array: True where the trip_id was added before.
+        """
+        hashes = hash_ids(ids)
+        found = np.zeros(len(hashes), dtype=bool)
+        for bucket, rows in self._by_bucket(hashes):
+            known = self._load(bucket)
+            if len(known):
+                pos = np.searchsorted(known, hashes[rows]).clip(max=len(known) - 1)
+                found[rows] = known[pos] == hashes[rows]
+        return found
+
+    def filter_new(self, df, column="trip_id"):
+        """
+        Drops the rows of df whose trip_id was already loaded by an earlier run.
+        Returns:
+            tuple[pl.DataFrame, int]: The new rows and the number of duplicates dropped.
+        """
+        if df.is_empty() or not self.exists():
+            return df, 0
+        seen = self.contains(df[column].to_list())
+        duplicates = int(seen.sum())
+        return (df.filter(pl.Series(~seen)) if duplicates else df), duplicates
+
+    def add(self, ids):
+        """
+        Merges trip_ids into the set (already known ones are kept once).
+        """
+        hashes = hash_ids(ids)
+        os.makedirs(self.root, exist_ok=True)
+        for bucket, rows in self._by_bucket(hashes):
+            merged = np.union1d(self._load(bucket), hashes[rows])
+            self._save(bucket, merged)
+
+    def rebuild(self, frames, column="trip_id"):
+        """
+        Replaces the set with the trip_ids of the given frames (e.g. a Silver
+        scan in batches), built aside and swapped in when complete.
+        Returns:
+            int: Number of ids in the new set.
+        """
+        final_root = self.root
+        self.root = f"{final_root}.tmp"
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root)
+        try:
+            for df in frames:
+                self.add(df[column].drop_nulls().to_list())
+        finally:
+            built, self.root = self.root, final_root
+        shutil.rmtree(final_root, ignore_errors=True)
+        os.replace(built, final_root)
+        return len(self)
+
+    def __len__(self):
+        if not self.exists():
+            return 0
+        return sum(
+            pl.scan_parquet(os.path.join(self.root, f)).select(pl.len()).collect().item()
+            for f in os.listdir(self.root) if f.endswith(".parquet")
+        )
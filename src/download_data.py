@@ -1,17 +1,46 @@
 import requests
+from requests.adapters import HTTPAdapter
+import polars as pl
+import json
 import os
+import queue
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from loguru import logger
+from src.metrics import track_stage, record, path_bytes
+from src.schemas import RAW_SCHEMA
 
 # Constants
 DATASET_ID = "wrvz-psew"
-BASE_URL = f"https://data.cityofchicago.org/resource/{DATASET_ID}.csv"
+# Overridable so the pipeline can be pointed at a local stand-in for the portal
+BASE_URL = os.getenv("SOCRATA_URL", f"https://data.cityofchicago.org/resource/{DATASET_ID}.csv")
 LIMIT = 800000  # Define row limit for dataset
 OUTPUT_FILE = "data/raw_data.csv"
 
+# Incremental mode
+PAGE_SIZE = 50000  # Rows per $offset page
+INCREMENTAL_DIR = "data/incremental"
+STATE_FILE = "data/state/download_state.json"
+
+# Parallel partitioned mode
+PARTITION_DIR = "data/partitions"
+MANIFEST_FILE = "data/state/partition_manifest.json"
+PARTITION_HOURS = 24  # Width of one time partition
+MAX_WORKERS = 4       # Concurrent connections to the portal
+
+# Pipelined mode (download parsed and ingested as it arrives)
+STREAM_CHUNK_BYTES = 8 * 1024 * 1024  # Approximate CSV bytes per parsed batch
+STREAM_QUEUE_BATCHES = 4              # Parsed batches buffered ahead of the consumer
+
 # --- RENAMED FUNCTION TO MATCH PIPELINE ---
-def download_dataset():
+@track_stage("download")
+def download_dataset(base_url=BASE_URL):
     """
     Fetches the latest dataset from the Chicago Data Portal API.
+    Args:
+        base_url (str): Socrata resource endpoint (overridable for local testing).
     Returns:
         str: The file path of the downloaded CSV, or None if failed.
     """
@@ -27,7 +56,7 @@ def download_dataset():
     
     try:
         # Stream the download to handle large file sizes efficiently
-        with requests.get(BASE_URL, params=params, stream=True) as r:
+        with requests.get(base_url, params=params, stream=True) as r:
             r.raise_for_status()
             
             with open(OUTPUT_FILE, 'wb') as f:
@@ -41,11 +70,376 @@ def download_dataset():
             return None # Return None on failure
         else:
             logger.success(f"Success! Downloaded {size_mb:.2f} MB to {OUTPUT_FILE}")
+            record(bytes_written=os.path.getsize(OUTPUT_FILE))
             return OUTPUT_FILE # --- CRITICAL: Return the path to the pipeline ---
             
     except Exception as e:
         logger.error(f"Network Failed: {e}")
         return None
 
+# --- PIPELINED MODE ---
+class CsvStream:
+    """
+    Iterates over a CSV HTTP response as Polars batches while it downloads.
+    A producer thread reads the response, cuts it at the last newline of
+    every ~chunk_bytes (so no row is split), parses each chunk and puts it on
+    a bounded queue; once the queue is full the download waits for the consumer.
+    Rows are assumed not to contain quoted newlines (true for the trips export).
+    Args:
+        base_url (str): Socrata resource endpoint.
+        params (dict): Query parameters.
+        raw_copy (str | None): Also write the raw response to this file (for audit).
+        chunk_bytes (int): Approximate bytes per batch.
+        queue_batches (int): Parsed batches buffered ahead of the consumer.
+    """
+    def __init__(self, base_url=BASE_URL, params=None, raw_copy=None,
+                 chunk_bytes=STREAM_CHUNK_BYTES, queue_batches=STREAM_QUEUE_BATCHES):
+        self.base_url = base_url
+        self.params = params
+        self.raw_copy = raw_copy
+        self.chunk_bytes = chunk_bytes
+        self.bytes_read = 0
+        self._queue = queue.Queue(maxsize=queue_batches)
+        self._stop = threading.Event()
+
+    def __iter__(self):
+        producer = threading.Thread(target=self._produce, name="csv-stream", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # The consumer stopped early (or failed): release the producer
+            self._stop.set()
+            producer.join()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _parse(self, header, body):
+        # Columns outside RAW_SCHEMA stay text: inferred per chunk, they could
+        # differ between batches (e.g. a code that is numeric until one isn't)
+        return pl.read_csv(header + body, schema_overrides=RAW_SCHEMA, infer_schema=False,
+                           ignore_errors=True)
+
+    def _produce(self):
+        raw = None
+        try:
+            if self.raw_copy:
+                os.makedirs(os.path.dirname(self.raw_copy) or ".", exist_ok=True)
+                raw = open(f"{self.raw_copy}.part", "wb")
+            header = None
+            pending = bytearray()
+            with requests.get(self.base_url, params=self.params, stream=True) as r:
+                r.raise_for_status()
+                for chunk in r.iter_content(chunk_size=1024 * 1024):
+                    if self._stop.is_set():
+                        return
+                    self.bytes_read += len(chunk)
+                    if raw:
+                        raw.write(chunk)
+                    pending += chunk
+                    if header is None:
+                        end = pending.find(b"\n")
+                        if end < 0:
+                            continue
+                        header, pending = bytes(pending[:end + 1]), pending[end + 1:]
+                    while len(pending) >= self.chunk_bytes:
+                        # Cut after the last complete row within the chunk (or the
+                        # first row, if it is longer); the rest starts the next chunk
+                        cut = (pending.rfind(b"\n", 0, self.chunk_bytes) + 1
+                               or pending.find(b"\n", self.chunk_bytes) + 1)
+                        if not cut:
+                            break
+                        if not self._put(self._parse(header, bytes(pending[:cut]))):
+                            return
+                        del pending[:cut]
+            if header is not None and pending.strip():
+                if not self._put(self._parse(header, bytes(pending))):
+                    return
+            if raw:
+                raw.close()
+                os.replace(f"{self.raw_copy}.part", self.raw_copy)
+                raw = None
+            self._put(None)
+        except Exception as e:
+            self._put(e)
+        finally:
+            if raw:
+                raw.close()
+
+def stream_dataset(base_url=BASE_URL, raw_copy=None, **kwargs):
+    """
+    Streams the latest-rows window (same query as download_dataset) as
+    Polars batches, without writing the CSV first (see CsvStream).
+    Returns:
+        CsvStream: Iterable of pl.DataFrame batches; bytes_read grows as it downloads.
+    """
+    params = {"$limit": LIMIT, "$order": "trip_start_timestamp DESC"}
+    logger.info(f"Streaming {LIMIT} rows (Latest Data)"
+                + (f", keeping a raw copy in {raw_copy}" if raw_copy else "") + "...")
+    return CsvStream(base_url, params, raw_copy=raw_copy, **kwargs)
+
+# --- INCREMENTAL MODE ---
+def _load_state(state_file):
+    """
+    Reads the download state (high-water mark and any unfinished page run).
+    """
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file) as f:
+        return json.load(f)
+
+def _save_state(state, state_file):
+    """
+    Atomically persists the download state so a crash never leaves it half-written.
+    """
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    tmp_path = f"{state_file}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_file)
+
+def _page_stats(page_path):
+    """
+    Returns (row count, max trip_start_timestamp) for a downloaded page.
+    """
+    stats = (
+        pl.scan_csv(page_path, infer_schema=False)
+        .select(pl.len().alias("rows"), pl.col("trip_start_timestamp").max().alias("max_ts"))
+        .collect()
+        .row(0)
+    )
+    return stats[0], stats[1]
+
+@track_stage("download_incremental")
+def download_incremental(base_url=BASE_URL, page_size=PAGE_SIZE,
+                         output_dir=INCREMENTAL_DIR, state_file=STATE_FILE):
+    """
+    Fetches only rows at or after the stored trip_start_timestamp high-water mark.
+    The bound is inclusive because portal timestamps are rounded to 15 minutes
+    and rows are published late: a row stamped with the watermark may appear
+    after the run that set it. Rows fetched again are skipped on ingest by the
+    unique trip_id index.
+    Results are paged with $offset into one CSV per page. Finished pages are
+    recorded in the state file, so an interrupted run resumes at the next page
+    and a completed but uncommitted run is returned again without refetching.
+    Returns:
+        list[str]: Page files holding new rows (empty if nothing is new),
+        or None if failed.
+    """
+    state = _load_state(state_file)
+    watermark = state.get("watermark")
+
+    where = f"trip_start_timestamp >= '{watermark}'" if watermark else None
+    pending = state.get("pending")
+    if pending and pending.get("complete") and pending.get("where") == where:
+        logger.info("Returning completed run that has not been committed yet.")
+        return pending["pages"]
+
+    # Bootstrap: without a watermark, take the usual latest-rows window once
+    if watermark is None:
+        logger.info("No watermark found. Bootstrapping with a full download...")
+        file_path = download_dataset(base_url)
+        if not file_path:
+            return None
+        _, max_ts = _page_stats(file_path)
+        pending = {"where": None, "pages": [file_path], "max_ts": max_ts, "complete": True}
+        _save_state({"watermark": None, "pending": pending}, state_file)
+        return pending["pages"]
+
+    if pending and pending.get("where") == where:
+        logger.info(f"Resuming interrupted run at offset {pending['next_offset']}...")
+    else:
+        pending = {"where": where, "next_offset": 0, "pages": [], "max_ts": watermark}
+
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"Downloading rows from {watermark} on...")
+
+    try:
+        with requests.Session() as session:
+            while True:
+                offset = pending["next_offset"]
+                # A stable total order is required for $offset paging to be consistent
+                params = {
+                    "$where": where,
+                    "$order": "trip_start_timestamp ASC, trip_id ASC",
+                    "$limit": page_size,
+                    "$offset": offset,
+                }
+                page_path = os.path.join(output_dir, f"page_{offset:010d}.csv")
+                part_path = f"{page_path}.part"
+
+                with session.get(base_url, params=params, stream=True) as r:
+                    r.raise_for_status()
+                    with open(part_path, "wb") as f:
+                        for chunk in r.iter_content(chunk_size=8192):
+                            f.write(chunk)
+                os.replace(part_path, page_path) # Only complete pages get their final name
+
+                rows, max_ts = _page_stats(page_path)
+                if rows == 0:
+                    os.remove(page_path)
+                    break
+
+                pending["pages"].append(page_path)
+                pending["next_offset"] = offset + rows
+                pending["max_ts"] = max(pending["max_ts"], max_ts)
+                _save_state({"watermark": watermark, "pending": pending}, state_file)
+                logger.info(f"Fetched page at offset {offset} ({rows} rows)")
+
+                if rows < page_size:
+                    break
+
+    except Exception as e:
+        logger.error(f"Network Failed: {e}")
+        return None
+
+    # The watermark only advances in commit_incremental(), after ingest succeeded
+    pending["complete"] = True
+    _save_state({"watermark": watermark, "pending": pending}, state_file)
+    logger.success(f"Success! Fetched {pending['next_offset']} rows "
+                   f"in {len(pending['pages'])} pages.")
+    record(rows_out=pending["next_offset"], bytes_written=path_bytes(*pending["pages"]))
+    return pending["pages"]
+
+def commit_incremental(state_file=STATE_FILE):
+    """
+    Advances the high-water mark past a completed page run.
+    Call this once the pages returned by download_incremental() are ingested.
+    """
+    state = _load_state(state_file)
+    pending = state.get("pending")
+    if not pending or not pending.get("complete"):
+        logger.warning("No completed incremental run to commit.")
+        return
+    _save_state({"watermark": pending["max_ts"]}, state_file)
+    logger.info(f"Watermark advanced to {pending['max_ts']}")
+
+# --- PARALLEL PARTITIONED MODE ---
+def _time_partitions(start, end, partition_hours):
+    """
+    Splits [start, end) into consecutive windows of partition_hours.
+    """
+    step = timedelta(hours=partition_hours)
+    lower = start
+    while lower < end:
+        upper = min(lower + step, end)
+        yield lower, upper
+        lower = upper
+
+def _partition_name(lower, upper):
+    return f"trips_{lower.strftime('%Y%m%dT%H%M')}_{upper.strftime('%Y%m%dT%H%M')}"
+
+def _fetch_partition(session, base_url, lower, upper, output_dir, page_size=PAGE_SIZE):
+    """
+    Downloads a single time partition into its own CSV file. The partition is
+    paged with $offset like download_incremental, so a busy window is never
+    cut off at one response's row limit.
+    """
+    fmt = "%Y-%m-%dT%H:%M:%S"
+    params = {
+        "$where": f"trip_start_timestamp >= '{lower.strftime(fmt)}' "
+                  f"AND trip_start_timestamp < '{upper.strftime(fmt)}'",
+        # A stable total order is required for $offset paging to be consistent
+        "$order": "trip_start_timestamp ASC, trip_id ASC",
+        "$limit": page_size,
+    }
+    name = _partition_name(lower, upper)
+    path = os.path.join(output_dir, f"{name}.csv")
+    part_path, page_path = f"{path}.part", f"{path}.page"
+
+    rows = 0
+    with open(part_path, "wb") as out:
+        while True:
+            with session.get(base_url, params={**params, "$offset": rows}, stream=True) as r:
+                r.raise_for_status()
+                with open(page_path, "wb") as f:
+                    for chunk in r.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+            page_rows, _ = _page_stats(page_path)
+            with open(page_path, "rb") as f:
+                if rows:
+                    f.readline()  # Every page repeats the header
+                shutil.copyfileobj(f, out)
+            rows += page_rows
+            if page_rows < page_size:
+                break
+    os.remove(page_path)
+    os.replace(part_path, path)
+    return name, path, rows
+
+@track_stage("download_partitioned")
+def download_partitioned(start, end, base_url=BASE_URL, partition_hours=PARTITION_HOURS,
+                         max_workers=MAX_WORKERS, output_dir=PARTITION_DIR,
+                         manifest_file=MANIFEST_FILE, page_size=PAGE_SIZE):
+    """
+    Backfills [start, end) by fetching time partitions concurrently over a
+    pooled session, one CSV per partition. Finished partitions are recorded
+    in a manifest so a failed run only re-fetches the missing ones.
+    Args:
+        start (datetime): Inclusive lower bound of trip_start_timestamp.
+        end (datetime): Exclusive upper bound of trip_start_timestamp.
+        page_size (int): Rows per $offset page within a partition.
+    Returns:
+        list[str]: Non-empty partition files in time order, or None if any
+        partition failed.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_state(manifest_file)
+    partitions = list(_time_partitions(start, end, partition_hours))
+
+    todo = [
+        (lower, upper) for lower, upper in partitions
+        if not os.path.exists(manifest.get(_partition_name(lower, upper), {}).get("path", ""))
+    ]
+    logger.info(f"Fetching {len(todo)} of {len(partitions)} partitions "
+                f"with {max_workers} workers...")
+
+    failed = 0
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(_fetch_partition, session, base_url, lower, upper, output_dir, page_size): lower
+                for lower, upper in todo
+            }
+            for future in as_completed(futures):
+                try:
+                    name, path, rows = future.result()
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Partition starting {futures[future]} failed: {e}")
+                    continue
+                # Results are collected on this thread, so the manifest needs no lock
+                manifest[name] = {"path": path, "rows": rows}
+                _save_state(manifest, manifest_file)
+
+    if failed:
+        logger.error(f"FAIL: {failed} partitions failed. Re-run to fetch only those.")
+        return None
+
+    # Header-only partitions are skipped so they cannot skew schema inference downstream
+    done = [manifest[_partition_name(lower, upper)] for lower, upper in partitions]
+    files = [entry["path"] for entry in done if entry["rows"] > 0]
+    logger.success(f"Success! {sum(e['rows'] for e in done)} rows "
+                   f"in {len(files)} partition files under {output_dir}")
+    record(rows_out=sum(e["rows"] for e in done), bytes_written=path_bytes(*files))
+    return files
+
 if __name__ == "__main__":
     download_dataset()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import polars as pl
+import logging
+import os
+import uuid
+from datetime import date, timedelta
+from src.silver_store import scan_silver, PARTITION_COLS, SILVER_DIR
+
+# --- LOGGING SETUP ---
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+# --- CONFIGURATION ---
+EXPORT_DIR = "data/exports"
+# Extracts larger than this stay on disk instead of being offered as a browser download
+MAX_DOWNLOAD_BYTES = int(os.getenv("EXPORT_MAX_DOWNLOAD_MB", "200")) * 1024 * 1024
+FORMATS = {
+    "parquet": ".parquet",
+    "ipc": ".arrow",
+    "csv": ".csv",
+}
+MIME_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "ipc": "application/vnd.apache.arrow.file",
+    "csv": "text/csv",
+}
+
+
+def export_query(start=None, end=None, companies=None, payment_types=None, areas=None,
+                 columns=None, root=SILVER_DIR):
+    """
+    Builds the lazy query for a trip-level Silver extract. The date range
+    prunes partitions by directory, the other filters and the column
+    selection are pushed down into the Parquet scan.
+    Args:
+        start (date): Inclusive first trip date.
+        end (date): Inclusive last trip date.
+        companies (list[str]): Keep only these companies (all if empty).
+        payment_types (list[str]): Keep only these payment types (all if empty).
+        areas (list[int]): Keep only these pickup community areas (all if empty).
+        columns (list[str]): Columns to export (all Silver columns if None).
+    Returns:
+        pl.LazyFrame: The filtered trips, without the partition key columns.
+    """
+    lf = scan_silver(start, end + timedelta(days=1) if end else None, root=root)
+    if not lf.collect_schema():
+        return lf
+    filters = [
+        pl.col(col).is_in(list(values))
+        for col, values in (("company", companies), ("payment_type", payment_types),
+                            ("pickup_community_area", areas))
+        if values
+    ]
+    if filters:
+        lf = lf.filter(*filters)
+    return lf.select(columns) if columns else lf.drop(PARTITION_COLS, strict=False)
+
+def export_silver(path, fmt="parquet", **filters):
+    """
+    Streams a filtered Silver extract to a file with Polars' streaming sinks,
+    so memory stays bounded by the chunk size rather than the extract size.
+    The file is written under a unique temporary name and renamed when complete.
+    Args:
+        path (str): Output file.
+        fmt (str): "parquet", "ipc" (Arrow) or "csv".
+        **filters: Passed to export_query.
+    Returns:
+        dict: path, format, rows and bytes of the written file.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {sorted(FORMATS)}")
+    lf = export_query(**filters)
+    if not lf.collect_schema():
+        logger.warning("No Silver rows match the export filters.")
+        return {"path": None, "format": fmt, "rows": 0, "bytes": 0}
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    if fmt == "parquet":
+        lf.sink_parquet(tmp_path, statistics=True)
+        rows = pl.scan_parquet(tmp_path).select(pl.len()).collect().item()
+    elif fmt == "ipc":
+        lf.sink_ipc(tmp_path)
+        rows = pl.scan_ipc(tmp_path).select(pl.len()).collect().item()
+    else:
+        lf.sink_csv(tmp_path)
+        rows = pl.scan_csv(tmp_path).select(pl.len()).collect().item()
+    os.replace(tmp_path, path)
+
+    size = os.path.getsize(path)
+    logger.info(f"Exported {rows} Silver rows to {path} ({size / 1024 / 1024:.1f} MB, {fmt}).")
+    return {"path": path, "format": fmt, "rows": rows, "bytes": size}
+
+def export_name(fmt, start=None, end=None):
+    """
+    A descriptive file name for an extract, unique per call so concurrent
+    exports (e.g. two dashboard sessions) never write to the same file,
+    e.g. silver_trips_2024-01-01_2024-01-31_3f2a9c1e07b4.parquet.
+    """
+    span = "_".join(d.isoformat() for d in (start, end) if d) or "all"
+    return f"silver_trips_{span}_{uuid.uuid4().hex[:12]}{FORMATS[fmt]}"
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Export a trip-level Silver extract")
+    parser.add_argument("--start", type=date.fromisoformat, help="First trip date (inclusive)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last trip date (inclusive)")
+    parser.add_argument("--company", action="append", dest="companies")
+    parser.add_argument("--payment-type", action="append", dest="payment_types")
+    parser.add_argument("--area", action="append", type=int, dest="areas",
+                        help="Pickup community area (repeatable)")
+    parser.add_argument("--columns", nargs="+")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--output", help=f"Output file (default: under {EXPORT_DIR}/)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(EXPORT_DIR, export_name(args.format, args.start, args.end))
+    export_silver(output, args.format, start=args.start, end=args.end, companies=args.companies,
+                  payment_types=args.payment_types, areas=args.areas, columns=args.columns)
@@ -27,15 +27,18 @@ class ChicagoTripRaw(BaseModel):
     class Config:
         populate_by_name = True
 
-# Data model for silver layer transformation
+# Data model for silver layer transformation.
+# Also compiled into the vectorized Silver checks (src/validation.py), so every
+# rule here is enforced on each batch; unmet rules send rows to quarantine.
 class ChicagoTripClean(BaseModel):
     trip_id: str
     start_time: datetime
     end_time: Optional[datetime]
-    duration_min: float
-    distance_miles: float
-    pickup_area: int
-    dropoff_area: Optional[int]
+    duration_min: float = Field(gt=1)       # Remove short trips (< 1 min)
+    distance_miles: float = Field(gt=0)     # Remove zero-distance trips
+    pickup_area: int = Field(ge=1, le=77)   # Chicago's 77 community areas
+    dropoff_area: int = Field(ge=1, le=77)
+    fare: float = Field(default=0.0, ge=0)  # Ensure fare is non-negative
     total_cost: float
     payment_type: str
     company: str
@@ -0,0 +1,84 @@
+import polars as pl
+import bson
+import logging
+
+# --- LOGGING SETUP ---
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+# --- CONFIGURATION ---
+BATCH_SIZE = 50000  # Documents per cursor batch
+
+# pymongoarrow decodes BSON straight into Arrow buffers; it is optional
+try:
+    from pymongoarrow.api import Schema, find_arrow_all
+    from bson import ObjectId
+    HAS_PYMONGOARROW = True
+except ImportError:
+    HAS_PYMONGOARROW = False
+
+
+def decode_raw_batch(raw_batch, columns):
+    """
+    Decodes one raw BSON batch into a Polars DataFrame, column by column.
+    Building one list per column avoids the row-wise schema inference that
+    pl.DataFrame(list_of_dicts) performs across every document.
+    Args:
+        raw_batch (bytes): Concatenated BSON documents from find_raw_batches.
+        columns (list[str]): Columns to extract (missing keys become null).
+    """
+    docs = bson.decode_all(raw_batch)
+    return pl.DataFrame(
+        [pl.Series(c, [d.get(c) for d in docs], strict=False) for c in columns]
+    )
+
+
+def _iter_raw_batches(collection, columns, query, batch_size):
+    projection = {c: 1 for c in columns}
+    projection["_id"] = 0
+    cursor = collection.find_raw_batches(query, projection, batch_size=batch_size)
+    for raw_batch in cursor:
+        yield decode_raw_batch(raw_batch, columns)
+
+
+def _iter_arrow_batches(collection, columns, query, batch_size, schema):
+    """
+    pymongoarrow has no batched cursor API, so batches are paged by _id.
+    """
+    arrow_schema = Schema({"_id": ObjectId, **schema})
+    last_id = None
+    while True:
+        page_query = query if last_id is None else {"$and": [query, {"_id": {"$gt": last_id}}]}
+        table = find_arrow_all(
+            collection, page_query, schema=arrow_schema, sort=[("_id", 1)], limit=batch_size
+        )
+        if table.num_rows == 0:
+            return
+        last_id = ObjectId(table.column("_id")[-1].as_py())
+        yield pl.from_arrow(table.drop(["_id"])).select(columns)
+        if table.num_rows < batch_size:
+            return
+
+
+def iter_frames(collection, columns, query=None, batch_size=BATCH_SIZE,
+                backend="bson", arrow_schema=None):
+    """
+    Streams a collection as Polars DataFrames of up to batch_size rows.
+    Only the requested columns are projected server-side.
+    Args:
+        collection: pymongo Collection to read.
+        columns (list[str]): Fields to project.
+        query (dict): Optional filter.
+        batch_size (int): Documents per batch.
+        backend (str): "bson" decodes raw cursor batches column by column;
+            "arrow" decodes directly into Arrow through pymongoarrow.
+        arrow_schema (dict): Field -> Python type mapping for the arrow backend.
+    Yields:
+        pl.DataFrame: One frame per cursor batch.
+    """
+    query = query or {}
+    if backend == "arrow":
+        if not HAS_PYMONGOARROW:
+            raise ImportError("The arrow reader backend requires the 'pymongoarrow' package.")
+        yield from _iter_arrow_batches(collection, columns, query, batch_size, arrow_schema)
+    else:
+        yield from _iter_raw_batches(collection, columns, query, batch_size)
@@ -0,0 +1,97 @@
+import polars as pl
+import logging
+import multiprocessing
+import os
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+# --- LOGGING SETUP ---
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+# --- CONFIGURATION ---
+# Total memory the month workers may plan on; it decides how many run at once
+MEMORY_BUDGET_MB = int(os.getenv("MEMORY_BUDGET_MB", "4096"))
+# Memory planned per month worker (a month of trips is the unit held at once)
+WORKER_MEMORY_MB = int(os.getenv("WORKER_MEMORY_MB", "1024"))
+# Cleaned rows staged by month: <STAGING_DIR>/month=YYYY-MM/part-*.parquet, then month=YYYY-MM.parquet
+STAGING_DIR = "data/processed/silver_staging"
+# In-memory size of a staged month relative to its Parquet file, for budget warnings
+PARQUET_EXPANSION = 5
+
+
+def pool_size(budget_mb=MEMORY_BUDGET_MB, worker_mb=WORKER_MEMORY_MB):
+    """
+    Number of month workers that fit the memory budget (at least one, at most one per CPU).
+    """
+    return max(1, min(os.cpu_count() or 1, budget_mb // worker_mb))
+
+def _init_worker(threads):
+    # Read by Polars when its thread pool starts, i.e. on the first query in this process
+    os.environ["POLARS_MAX_THREADS"] = str(threads)
+
+def map_months(fn, months, budget_mb=MEMORY_BUDGET_MB, worker_mb=WORKER_MEMORY_MB, **kwargs):
+    """
+    Runs fn(month, **kwargs) for every month partition in a process pool sized
+    by the memory budget. The CPUs are split between the workers, so their
+    Polars thread pools do not oversubscribe the machine.
+    Returns:
+        list: Results in the order of `months`.
+    """
+    months = list(months)
+    if not months:
+        return []
+    workers = min(pool_size(budget_mb, worker_mb), len(months))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    logger.info(f"Processing {len(months)} month partitions with {workers} worker(s) "
+                f"x {threads} thread(s), memory budget {budget_mb} MB.")
+    # Forking a process that already runs Polars threads can deadlock, so workers are spawned
+    with ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker, initargs=(threads,),
+    ) as pool:
+        futures = [pool.submit(fn, month, **kwargs) for month in months]
+        return [f.result() for f in futures]
+
+
+# ----------------------------------------------------------------
+# MONTH STAGING
+# ----------------------------------------------------------------
+def month_key(ts_col="trip_start_timestamp"):
+    return pl.col(ts_col).dt.strftime("%Y-%m")
+
+def reset_staging(root=STAGING_DIR):
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+
+def stage_batch(df, root=STAGING_DIR):
+    """
+    Appends one cleaned batch to the staging area, one file per month it touches.
+    """
+    keyed = df.with_columns(month_key().alias("_month"))
+    for (month,), part in keyed.partition_by("_month", as_dict=True, include_key=False).items():
+        directory = os.path.join(root, f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+        part.write_parquet(os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet"))
+
+def staged_months(root=STAGING_DIR):
+    """
+    The month directories written by stage_batch, oldest first.
+    """
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        os.path.join(root, d) for d in os.listdir(root)
+        if d.startswith("month=") and os.path.isdir(os.path.join(root, d))
+    )
+
+def check_budget(month_dir, worker_mb=WORKER_MEMORY_MB):
+    """
+    Warns when a staged month is likely to need more than one worker's share of the budget.
+    """
+    size_mb = sum(
+        os.path.getsize(os.path.join(month_dir, f)) for f in os.listdir(month_dir)
+    ) / 1024 ** 2
+    if size_mb * PARQUET_EXPANSION > worker_mb:
+        logger.warning(f"{os.path.basename(month_dir)} holds {size_mb:.0f} MB of Parquet, which may "
+                       f"exceed WORKER_MEMORY_MB={worker_mb}; raise it or lower the pool size.")
@@ -20,56 +20,207 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ChicagoTransitPipeline")
 
-def run_pipeline():
+def _download_stage(incremental, backfill_range):
+    """
+    Returns the run function and output artifacts of the download step.
+    """
+    from src.download_data import (
+        download_dataset, download_incremental, download_partitioned,
+        OUTPUT_FILE, INCREMENTAL_DIR, PARTITION_DIR,
+    )
+
+    def run(upstream):
+        if incremental:
+            files = download_incremental()
+        elif backfill_range:
+            files = download_partitioned(*backfill_range)
+        else:
+            file_path = download_dataset()
+            files = [file_path] if file_path else None
+        if files is None or (backfill_range and not files):
+            raise RuntimeError("Download failed or incomplete")
+        return files
+
+    if incremental:
+        # The first incremental run bootstraps with a full download
+        return run, (f"dir:{INCREMENTAL_DIR}", f"file:{OUTPUT_FILE}")
+    if backfill_range:
+        return run, (f"dir:{PARTITION_DIR}",)
+    return run, (f"file:{OUTPUT_FILE}",)
+
+def _pipelined_stage(raw_copy):
+    """
+    Returns the run function and outputs of the combined download+ingest step:
+    the response is parsed and inserted into Bronze while it downloads.
+    """
+    from src.download_data import stream_dataset, OUTPUT_FILE
+    from src.ingest import ingest_stream, COLLECTION_NAME
+    from src.metrics import track_stage
+
+    def run(upstream):
+        with track_stage("download_ingest") as stage:
+            stream = stream_dataset(raw_copy=OUTPUT_FILE if raw_copy else None)
+            stage.rows_in, stage.rows_out = ingest_stream(stream)
+            stage.bytes_read = stream.bytes_read
+            if raw_copy:
+                stage.bytes_written = stream.bytes_read
+        if not stage.rows_in:
+            raise RuntimeError("Download failed or incomplete")
+
+    outputs = (f"mongo:{COLLECTION_NAME}",)
+    return run, outputs + ((f"file:{OUTPUT_FILE}",) if raw_copy else ())
+
+def build_stages(incremental=False, backfill_range=None, pipelined=False, raw_copy=False,
+                 out_of_core=False):
+    """
+    Declares the pipeline as a DAG of stages with their inputs and outputs.
+    The Silver Parquet and MongoDB writes depend only on the staged rows,
+    so they run concurrently. In pipelined mode (full downloads only) the
+    download and ingest steps are one stage that never writes the CSV,
+    unless raw_copy keeps it for audit. Out of core, Silver is staged by
+    month and Silver and Gold process months in a process pool.
+    """
+    # Local imports ensure circular dependencies are avoided and the path fix works first
+    from src.dag import Stage
+    from src.indexes import ensure_indexes
+    from src.download_data import commit_incremental
+    from src.ingest import ingest_raw_data, COLLECTION_NAME
+    from src.clean import (
+        prepare_silver, write_silver_parquet, write_silver_mongo, commit_silver,
+        SILVER_STAGING_FILE, TARGET_COLLECTION,
+    )
+    from src.silver_store import SILVER_DIR
+    from src.out_of_core import STAGING_DIR
+    from src.dedup import TRIP_ID_SET_DIR
+    from src.aggregate import aggregate_gold_metrics, GOLD_METRICS, PARTIAL_STATES
+    from src.sketch import SKETCH_COLLECTION
+
+    if pipelined and (incremental or backfill_range):
+        raise ValueError("Pipelined mode only applies to full downloads")
+    download, raw_files = _download_stage(incremental, backfill_range)
+    mode = {"incremental": incremental, "backfill": [str(b) for b in backfill_range or ()],
+            "out_of_core": out_of_core}
+
+    def ingest(upstream):
+        files = upstream["download"]
+        if files:
+            ingest_raw_data(files, streaming=True, append=incremental)
+        if incremental:
+            commit_incremental()
+
+    staged = f"dir:{STAGING_DIR}" if out_of_core else f"file:{SILVER_STAGING_FILE}"
+    gold_outputs = tuple(f"mongo:{m.collection}" for m in GOLD_METRICS) + tuple(
+        f"mongo:{s.collection}" for s in PARTIAL_STATES
+    ) + (f"mongo:{SKETCH_COLLECTION}",)
+    if pipelined:
+        stream, stream_outputs = _pipelined_stage(raw_copy)
+        bronze = [
+            # A source stage: it always reruns, like the download it replaces
+            Stage("ingest", stream, after=("indexes",), outputs=stream_outputs,
+                  params={**mode, "pipelined": True}, retries=1),
+        ]
+    else:
+        bronze = [
+            Stage("download", download, outputs=raw_files, params=mode, retries=1),
+            # Incremental ingest follows the download watermark, so it runs whenever download does
+            Stage("ingest", ingest, after=("download", "indexes"),
+                  inputs=() if incremental else raw_files,
+                  outputs=(f"mongo:{COLLECTION_NAME}",), params=mode),
+        ]
+    return [
+        # Declared indexes (unique trip_id, dashboard compounds) are created idempotently
+        Stage("indexes", lambda upstream: ensure_indexes()),
+        *bronze,
+        Stage("silver_prepare",
+              lambda upstream: prepare_silver(incremental, replace_partitions=bool(backfill_range),
+                                              out_of_core=out_of_core),
+              after=("ingest",), inputs=(f"mongo:{COLLECTION_NAME}",), outputs=(staged,), params=mode),
+        Stage("silver_parquet", lambda upstream: write_silver_parquet(upstream["silver_prepare"]),
+              after=("silver_prepare",), inputs=(staged,), outputs=(f"dir:{SILVER_DIR}",)),
+        Stage("silver_mongo", lambda upstream: write_silver_mongo(upstream["silver_prepare"]),
+              after=("silver_prepare",), inputs=(staged,), outputs=(f"mongo:{TARGET_COLLECTION}",)),
+        Stage("silver_commit", lambda upstream: commit_silver(upstream["silver_prepare"]),
+              after=("silver_prepare", "silver_parquet", "silver_mongo"), inputs=(staged,),
+              outputs=(f"dir:{TRIP_ID_SET_DIR}",)),
+        Stage("gold", lambda upstream: aggregate_gold_metrics(incremental=incremental, out_of_core=out_of_core),
+              after=("silver_commit",), inputs=(f"dir:{SILVER_DIR}",), outputs=gold_outputs,
+              params=mode),
+    ]
+
+def run_pipeline(incremental=False, backfill_range=None, force=False,
+                 metrics_export=os.getenv("METRICS_EXPORT"), pipelined=False, raw_copy=False,
+                 out_of_core=False):
     """
     Master Orchestration Function.
     
-    This function executes the End-to-End ELT pipeline in the following order:
+    This function executes the End-to-End ELT pipeline as a DAG of stages:
     1. Bronze Layer: Ingests raw data from the external Socrata API.
     2. Silver Layer: Cleans, validates schema, and deduplicates data using Polars.
     3. Gold Layer: Aggregates business logic for downstream dashboard consumption.
+
+    Stages whose inputs are unchanged since their last successful run are
+    skipped, and a rerun after a failure resumes at the failed stage.
     
+    Args:
+        incremental (bool): Only download and append rows newer than the
+            stored watermark instead of re-fetching the full window.
+        backfill_range (tuple[datetime, datetime] | None): Download this
+            trip_start_timestamp range as parallel time partitions instead.
+        force (bool): Rerun every stage, ignoring recorded input hashes.
+        metrics_export (str | None): Also export the run's stage metrics as
+            "prometheus" (textfile collector) or "json" under data/metrics/.
+            Runs are always saved to the pipeline_runs collection.
+        pipelined (bool): Parse and insert the full download while it is
+            still arriving, without writing the intermediate CSV.
+        raw_copy (bool): In pipelined mode, still keep the raw CSV for audit.
+        out_of_core (bool): Process Silver and Gold month by month in a
+            process pool sized by MEMORY_BUDGET_MB, for histories larger than RAM.
+
     Raises:
         Exception: Propagates any critical errors encountered during execution.
     """
     logger.info("🚀 Starting Chicago Transit Analytics Pipeline...")
 
     try:
-        # ----------------------------------------------------------------
-        # STEP 1: BRONZE LAYER (Data Ingestion)
-        # ----------------------------------------------------------------
-        logger.info("--- Step 1: Ingesting Raw Data (Bronze Layer) ---")
-        
-        # Local imports ensure circular dependencies are avoided and the path fix works first
-        from src.download_data import download_dataset
-        from src.ingest import ingest_raw_data
-        
-        file_path = download_dataset()
-        if file_path:
-            ingest_raw_data(file_path)
-        else:
-            logger.error("Critical Failure: Dataset download returned None. Aborting pipeline.")
-            return
+        from src.dag import run_dag
+        from src.metrics import pipeline_run
+        with pipeline_run(export=metrics_export):
+            status = run_dag(build_stages(incremental, backfill_range, pipelined, raw_copy, out_of_core), force=force)
+        summary = ", ".join(f"{name}={state}" for name, state in status.items())
+        if any(state in ("failed", "blocked") for state in status.values()):
+            logger.error(f"Critical Failure: pipeline stopped ({summary}). "
+                         "Rerun to resume from the failed stage.")
+            return status
 
-        # ----------------------------------------------------------------
-        # STEP 2: SILVER LAYER (Data Cleaning & Validation)
-        # ----------------------------------------------------------------
-        logger.info("--- Step 2: Processing Silver Layer (Cleaning & Schema Validation) ---")
-        from src.clean import clean_and_load_silver
-        clean_and_load_silver()
-
-        # ----------------------------------------------------------------
-        # STEP 3: GOLD LAYER (Business Aggregations)
-        # ----------------------------------------------------------------
-        logger.info("--- Step 3: Building Gold Layer (Business Aggregations) ---")
-        from src.aggregate import aggregate_gold_metrics
-        aggregate_gold_metrics()
-
-        logger.info(" Pipeline Execution Completed Successfully!")
+        logger.info(f" Pipeline Execution Completed Successfully! ({summary})")
+        return status
 
     except Exception as e:
         logger.critical(f"Pipeline execution failed with unhandled exception: {e}")
         raise e
 
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description="Chicago Transit Analytics Pipeline")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch rows newer than the stored watermark")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"),
+                        type=datetime.fromisoformat,
+                        help="Fetch [START, END) as parallel time partitions")
+    parser.add_argument("--force", action="store_true",
+                        help="Rerun every stage even if its inputs are unchanged")
+    parser.add_argument("--metrics-export", choices=["prometheus", "json"],
+                        default=os.getenv("METRICS_EXPORT"),
+                        help="Also export per-stage metrics under data/metrics/")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Ingest the full download as it arrives, without the intermediate CSV")
+    parser.add_argument("--raw-copy", action="store_true",
+                        help="With --pipelined, also keep the raw CSV on disk for audit")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="Process Silver and Gold by month within MEMORY_BUDGET_MB")
+    args = parser.parse_args()
+    run_pipeline(incremental=args.incremental, backfill_range=args.backfill, force=args.force,
+                 metrics_export=args.metrics_export, pipelined=args.pipelined, raw_copy=args.raw_copy,
+                 out_of_core=args.out_of_core)
\ No newline at end of file
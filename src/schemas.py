@@ -0,0 +1,75 @@
+import polars as pl
+from typing import get_args
+from src.models import ChicagoTripRaw
+
+# --- CONFIGURATION ---
+# Low-cardinality labels are dictionary-encoded. Categorical rather than Enum,
+# so a payment type or company first seen in new data does not fail the load.
+LABEL = pl.Categorical
+# Chicago has 77 community areas
+COMMUNITY_AREA = pl.Int8
+TIMESTAMP = pl.Datetime("us")
+# Money is kept to the cent. Polars' Decimal is 128 bits wide (twice a
+# Float64) and not BSON-encodable, so cents-rounded Float64 is used instead.
+MONEY = pl.Float64
+MONEY_DECIMALS = 2
+MONEY_COLS = ["fare", "tips", "tolls", "extras", "trip_total"]
+LABEL_COLS = ["payment_type", "company"]
+
+
+def _raw_schema():
+    """
+    Bronze columns (portal names) with the ChicagoTripRaw types. Values are
+    kept as delivered (numbers as Float64, timestamps as text), so malformed
+    ones still reach the Silver checks as type errors.
+    """
+    schema = {}
+    for name, field in ChicagoTripRaw.model_fields.items():
+        types = [t for t in get_args(field.annotation) if t is not type(None)] or [field.annotation]
+        schema[field.alias or name] = pl.Float64 if types[0] is float else pl.String
+    return {**schema, **{c: LABEL for c in LABEL_COLS}}
+
+# Bronze: applied when the CSV is parsed and when Bronze documents are read back
+RAW_SCHEMA = _raw_schema()
+
+# Silver: applied to validated rows before they are written, and on every Silver scan
+SILVER_SCHEMA = {
+    "trip_id": pl.String,
+    # ~7k cabs, so the 128-character ids dictionary-encode well
+    "taxi_id": LABEL,
+    "trip_start_timestamp": TIMESTAMP,
+    "trip_end_timestamp": TIMESTAMP,
+    "trip_seconds": pl.Int32,
+    "trip_miles": pl.Float64,
+    **{c: MONEY for c in MONEY_COLS},
+    **{c: LABEL for c in LABEL_COLS},
+    "pickup_community_area": COMMUNITY_AREA,
+    "dropoff_community_area": COMMUNITY_AREA,
+    "pickup_centroid_latitude": pl.Float64,
+    "pickup_centroid_longitude": pl.Float64,
+    "dropoff_centroid_latitude": pl.Float64,
+    "dropoff_centroid_longitude": pl.Float64,
+    "duration_min": pl.Float64,
+    "silver_batch": pl.String,
+}
+
+
+def conform(df, schema, strict=True):
+    """
+    Casts the columns of df that the schema declares (others are left as they are).
+    Args:
+        df (pl.DataFrame | pl.LazyFrame): Frame to cast.
+        schema (dict): Column -> Polars type.
+        strict (bool): Raise on values that do not convert, instead of nulling them.
+    """
+    present = df.collect_schema() if isinstance(df, pl.LazyFrame) else df.schema
+    return df.with_columns(
+        pl.col(c).cast(dtype, strict=strict) for c, dtype in schema.items()
+        if c in present and present[c] != dtype
+    )
+
+def matches(actual, schema):
+    """
+    True if every declared column present in `actual` has the declared type.
+    """
+    return all(actual[c] == dtype for c, dtype in schema.items() if c in actual)
@@ -0,0 +1,188 @@
+import polars as pl
+import logging
+import os
+import shutil
+import uuid
+from datetime import date
+from src.schemas import SILVER_SCHEMA, conform
+
+# --- LOGGING SETUP ---
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+# --- CONFIGURATION ---
+# Hive-partitioned Silver dataset: <SILVER_DIR>/year=YYYY/month=M/day=D/part-*.parquet
+SILVER_DIR = "data/processed/silver_trips"
+PARTITION_COLS = ["year", "month", "day"]
+ROW_GROUP_SIZE = 64000  # Small enough for useful min/max pruning, large enough to scan fast
+COMPACT_MIN_FILES = 2   # Partitions with at least this many files get compacted
+
+
+def _partition_dir(root, year, month, day):
+    return os.path.join(root, f"year={year}", f"month={month}", f"day={day}")
+
+def _with_partition_keys(df):
+    """
+    Derives the year/month/day partition keys from trip_start_timestamp.
+    """
+    ts = pl.col("trip_start_timestamp")
+    keyed = df.with_columns(
+        ts.dt.year().alias("year"), ts.dt.month().alias("month"), ts.dt.day().alias("day")
+    )
+    dropped = keyed["year"].null_count()
+    if dropped:
+        logger.warning(f"Skipping {dropped} Silver rows without a parseable trip_start_timestamp.")
+    return keyed.drop_nulls(subset=PARTITION_COLS)
+
+def _write_file(df, directory, name=None):
+    """
+    Writes one part file, named `name` or a random id. The file is written
+    under a temporary name and renamed, so a part is never seen half-written
+    and a named part is replaced whole.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{name or uuid.uuid4().hex}.parquet")
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+    df.write_parquet(tmp_path, row_group_size=ROW_GROUP_SIZE, statistics=True)
+    os.replace(tmp_path, path)
+    return path
+
+def write_silver(df, mode="append", root=SILVER_DIR, batch=None):
+    """
+    Writes Silver rows into the day-partitioned dataset.
+    Args:
+        df (pl.DataFrame): Cleaned Silver rows.
+        mode (str): "append" adds a file to each touched partition,
+            "replace" swaps out only the partitions present in df,
+            "overwrite" rebuilds the whole dataset.
+        root (str): Dataset root directory.
+        batch (str): Names the files after a Silver batch, so writing the
+            same batch again (e.g. a retried append) replaces them instead of
+            adding its rows twice.
+    Returns:
+        int: Number of partitions written.
+    """
+    keyed = _with_partition_keys(df)
+    if mode == "overwrite":
+        shutil.rmtree(root, ignore_errors=True)
+
+    groups = keyed.partition_by(PARTITION_COLS, as_dict=True, include_key=False)
+    for (year, month, day), part in groups.items():
+        target = _partition_dir(root, year, month, day)
+        if mode == "replace" and os.path.isdir(target):
+            # Write the new generation outside the dataset root, then swap directories
+            staging = os.path.join(f"{root}.staging", uuid.uuid4().hex)
+            _write_file(part.sort("trip_start_timestamp"), staging, batch)
+            shutil.rmtree(target)
+            os.replace(staging, target)
+        else:
+            _write_file(part.sort("trip_start_timestamp"), target, batch)
+
+    logger.info(f"Wrote {len(keyed)} Silver rows to {len(groups)} partitions ({mode}).")
+    return len(groups)
+
+def _partition_files(root, start, end):
+    """
+    Lists the files of partitions whose day falls in [start, end).
+    Pruning on directory names means out-of-range partitions are never opened.
+    """
+    files = []
+    for directory, _, names in os.walk(root):
+        keys = dict(
+            part.split("=", 1) for part in os.path.relpath(directory, root).split(os.sep) if "=" in part
+        )
+        if set(keys) != set(PARTITION_COLS):
+            continue
+        day = date(int(keys["year"]), int(keys["month"]), int(keys["day"]))
+        if (start is None or day >= start) and (end is None or day < end):
+            files += sorted(os.path.join(directory, n) for n in names if n.endswith(".parquet"))
+    return files
+
+def silver_months(start=None, end=None, root=SILVER_DIR):
+    """
+    Lists the months present in the dataset as [first day, next month's first
+    day) ranges, clipped to [start, end), oldest first.
+    """
+    months = set()
+    for path in _partition_files(root, start, end):
+        keys = dict(part.split("=", 1) for part in path.split(os.sep) if "=" in part)
+        months.add(date(int(keys["year"]), int(keys["month"]), 1))
+    ranges = []
+    for first in sorted(months):
+        following = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+        ranges.append((max(first, start) if start else first, min(following, end) if end else following))
+    return ranges
+
+def silver_exists(root=SILVER_DIR):
+    """
+    Returns True if at least one Silver partition file has been written.
+    """
+    for _, _, files in os.walk(root):
+        if any(f.endswith(".parquet") for f in files):
+            return True
+    return False
+
+def silver_schema(root=SILVER_DIR):
+    """
+    Returns the column types of the most recently written Silver file, or
+    None if the dataset is empty.
+    """
+    files = [os.path.join(d, f) for d, _, names in os.walk(root) for f in names if f.endswith(".parquet")]
+    if not files:
+        return None
+    return pl.read_parquet_schema(max(files, key=os.path.getmtime))
+
+def scan_silver(start=None, end=None, root=SILVER_DIR):
+    """
+    Lazily scans the Silver dataset, optionally bounded to [start, end).
+    Args:
+        start (date): Inclusive first trip date.
+        end (date): Exclusive last trip date.
+    Returns:
+        pl.LazyFrame: Silver rows (partition key columns included), with the
+        declared Silver types.
+    """
+    if start is None and end is None:
+        source = os.path.join(root, "**", "*.parquet")
+    else:
+        source = _partition_files(root, start, end)
+        if not source:
+            return pl.LazyFrame()
+    return conform(pl.scan_parquet(
+        source,
+        hive_partitioning=True,
+        hive_schema={c: pl.Int32 for c in PARTITION_COLS},
+        missing_columns="insert",
+    ), SILVER_SCHEMA)
+
+def compact_partitions(root=SILVER_DIR, min_files=COMPACT_MIN_FILES):
+    """
+    Merges the small files that incremental appends leave in each partition
+    into a single sorted file per partition.
+    Returns:
+        int: Number of partitions compacted.
+    """
+    compacted = 0
+    for directory, _, files in os.walk(root):
+        parts = sorted(f for f in files if f.endswith(".parquet"))
+        if len(parts) < min_files:
+            continue
+        paths = [os.path.join(directory, f) for f in parts]
+        merged = pl.concat([pl.read_parquet(p) for p in paths], how="vertical_relaxed")
+        _write_file(merged.sort("trip_start_timestamp"), directory)
+        for path in paths:
+            os.remove(path)
+        compacted += 1
+        logger.info(f"Compacted {len(paths)} files in {directory}")
+    logger.info(f"Compaction complete: {compacted} partitions rewritten.")
+    return compacted
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Silver dataset maintenance")
+    parser.add_argument("command", choices=["compact"])
+    parser.add_argument("--min-files", type=int, default=COMPACT_MIN_FILES)
+    args = parser.parse_args()
+    if args.command == "compact":
+        compact_partitions(min_files=args.min_files)
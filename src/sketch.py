@@ -0,0 +1,165 @@
+import math
+import polars as pl
+
+# --- CONFIGURATION ---
+SKETCH_COLLECTION = "gold_sketches"
+# Quantiles come back within 1% of the true value (relative error)
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+# Values at or below this (e.g. no-charge fares) share one bucket reported as 0
+MIN_VALUE = 0.01
+ZERO_BUCKET = -(2 ** 15)
+# Dimensions with one sketch per day and value; any date range merges them
+SKETCH_DIMENSIONS = ["hour", "payment_type", "pickup_community_area"]
+SKETCH_MEASURES = ["fare", "duration_min"]
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+# ----------------------------------------------------------------
+# LOG-BUCKET SKETCH (DDSketch)
+# ----------------------------------------------------------------
+# A sketch is {bucket index: count}. Bucket i holds values in
+# (GAMMA^(i-1), GAMMA^i], so every value is within RELATIVE_ACCURACY of the
+# bucket's representative. Sketches merge by adding counts per bucket, which
+# is exact and order-independent (in MongoDB it is a plain $inc).
+
+def bucket_expr(col):
+    """
+    Vectorized bucket index for a column (null values stay null).
+    """
+    value = pl.col(col)
+    return (
+        pl.when(value > MIN_VALUE).then((value.log() / LOG_GAMMA).ceil())
+        .when(value.is_not_null()).then(ZERO_BUCKET)
+        .cast(pl.Int32)
+    )
+
+def bucket_value(bucket):
+    """
+    The representative value of a bucket (the one with the least relative error).
+    """
+    if bucket == ZERO_BUCKET:
+        return 0.0
+    return 2 * GAMMA ** bucket / (GAMMA + 1)
+
+def merge(sketches):
+    """
+    Adds up sketches (dicts of bucket -> count; keys may be strings as stored in MongoDB).
+    """
+    merged = {}
+    for sketch in sketches:
+        for bucket, count in (sketch or {}).items():
+            merged[int(bucket)] = merged.get(int(bucket), 0) + count
+    return merged
+
+def quantile(sketch, q):
+    """
+    Returns the q-quantile (0 <= q <= 1) of a sketch, or None if it is empty.
+    """
+    total = sum(sketch.values())
+    if total == 0:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for bucket in sorted(sketch):
+        seen += sketch[bucket]
+        if seen > rank:
+            return round(bucket_value(bucket), 2)
+    return round(bucket_value(max(sketch)), 2)
+
+
+# ----------------------------------------------------------------
+# BUILDING (one pass over Silver per dimension)
+# ----------------------------------------------------------------
+def sketch_partials(silver, dimension, measures=SKETCH_MEASURES):
+    """
+    Counts trips per (date, dimension value, measure, bucket) in one lazy
+    group-by. Memory is bounded by the number of distinct buckets, not trips.
+    Returns:
+        pl.LazyFrame: date, key, measure, bucket, count.
+    """
+    ts = pl.col("trip_start_timestamp")
+    key = ts.dt.hour() if dimension == "hour" else pl.col(dimension)
+    return (
+        silver.select(
+            ts.dt.strftime("%Y-%m-%d").alias("date"),
+            key.alias("key"),
+            *[bucket_expr(m).alias(m) for m in measures],
+        )
+        .unpivot(index=["date", "key"], on=measures, variable_name="measure", value_name="bucket")
+        .drop_nulls("bucket")
+        .group_by("date", "key", "measure", "bucket")
+        .agg(pl.len().alias("count"))
+    )
+
+def sketch_id(dimension, date, key):
+    return f"{dimension}|{date}|{key}"
+
+def sketch_documents(partials, dimension):
+    """
+    Turns collected partials into one document per (date, dimension value),
+    holding a {bucket: count} sketch per measure.
+    """
+    grouped = (
+        partials.group_by("date", "key", "measure")
+        .agg(pl.col("bucket").cast(pl.String), pl.col("count"))
+    )
+    docs = {}
+    for date, key, measure, buckets, counts in grouped.iter_rows():
+        doc = docs.setdefault((date, key), {
+            "_id": sketch_id(dimension, date, key), "dimension": dimension, "date": date, "key": key,
+        })
+        doc[measure] = dict(zip(buckets, counts))
+    return list(docs.values())
+
+def sketch_increments(partials, dimension):
+    """
+    The $inc / $setOnInsert updates that merge partials into stored sketches,
+    keyed by document _id.
+    """
+    updates = {}
+    for date, key, measure, bucket, count in partials.iter_rows():
+        update = updates.setdefault(sketch_id(dimension, date, key), {
+            "$inc": {}, "$setOnInsert": {"dimension": dimension, "date": date, "key": key},
+        })
+        update["$inc"][f"{measure}.{bucket}"] = count
+    return updates
+
+
+# ----------------------------------------------------------------
+# QUERYING
+# ----------------------------------------------------------------
+def query_quantiles(db, dimension, start=None, end=None, measures=SKETCH_MEASURES, quantiles=QUANTILES):
+    """
+    Answers percentiles per dimension value for any date range by merging
+    the stored daily sketches, without reading Silver.
+    Args:
+        dimension (str): One of SKETCH_DIMENSIONS.
+        start (date): Inclusive first trip date.
+        end (date): Inclusive last trip date.
+    Returns:
+        list[dict]: One row per value, e.g. {"key": 8, "fare_p50": 12.3, ...},
+        sorted by key.
+    """
+    match = {"dimension": dimension}
+    if start is not None or end is not None:
+        match["date"] = {}
+        if start is not None:
+            match["date"]["$gte"] = start.isoformat()
+        if end is not None:
+            match["date"]["$lte"] = end.isoformat()
+    projection = {"_id": 0, "key": 1, **{m: 1 for m in measures}}
+
+    by_key = {}
+    for doc in db[SKETCH_COLLECTION].find(match, projection):
+        by_key.setdefault(doc["key"], []).append(doc)
+    rows = []
+    for key in sorted(by_key, key=lambda k: (k is None, k)):
+        row = {"key": key}
+        for m in measures:
+            sketch = merge(doc.get(m) for doc in by_key[key])
+            for q in quantiles:
+                row[f"{m}_p{round(q * 100)}"] = quantile(sketch, q)
+        rows.append(row)
+    return rows
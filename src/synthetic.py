@@ -0,0 +1,233 @@
+import numpy as np
+import polars as pl
+import logging
+import os
+from datetime import datetime
+from typing import get_args
+from src.models import ChicagoTripRaw
+
+# --- LOGGING SETUP ---
+logger = logging.getLogger("ChicagoTransitPipeline")
+
+# --- CONFIGURATION ---
+OUTPUT_FILE = "data/synthetic_trips.csv"
+BATCH_SIZE = 1_000_000       # Rows generated per batch (bounds memory for large sizes)
+DUPLICATE_RATE = 0.01        # Share of extra rows that repeat an earlier trip_id
+DIRTY_RATE = 0.02            # Share of rows with a defect the Silver rules must catch
+START = datetime(2024, 1, 1)
+DAYS = 30
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.000"
+
+# Relative trip volume per hour of day (overnight trough, commute and evening peaks)
+HOUR_WEIGHTS = [
+    2.6, 1.9, 1.4, 1.0, 0.8, 1.0, 1.9, 3.4, 4.8, 4.9, 4.6, 4.8,
+    5.2, 5.3, 5.5, 5.9, 6.3, 6.7, 6.6, 5.6, 4.6, 4.1, 3.8, 3.2,
+]
+# Busiest pickup community areas (Near North, Loop, Near West, O'Hare, Lake View,
+# Near South, Midway, Lincoln Park); the remaining areas share a long tail
+AREA_WEIGHTS = {8: 24.0, 32: 18.0, 28: 8.0, 76: 7.0, 6: 4.0, 33: 3.5, 56: 3.0, 7: 3.0}
+PAYMENT_WEIGHTS = {
+    "Credit Card": 0.45, "Cash": 0.30, "Mobile": 0.10, "Prcard": 0.10,
+    "Unknown": 0.04, "No Charge": 0.01,
+}
+COMPANY_WEIGHTS = {
+    "Flash Cab": 0.20, "Taxi Affiliation Services": 0.15, "Sun Taxi": 0.12,
+    "City Service": 0.11, "Chicago Carriage Cab Corp": 0.09, "Medallion Leasin": 0.08,
+    "Globe Taxi": 0.07, "Blue Ribbon Taxi Association": 0.07, "Star North Taxi Management Llc": 0.06,
+    "Top Cab": 0.05,
+}
+TAXI_POOL = 3000
+# Meter: flag pull plus per mile plus waiting time
+BASE_FARE, PER_MILE, PER_MINUTE = 3.25, 2.25, 0.20
+AIRPORT_AREAS = (76, 56)
+DIRTY_KINDS = ("short_trip", "zero_miles", "negative_fare", "missing_area", "bad_timestamp", "missing_id")
+
+
+def _weights(mapping):
+    keys = list(mapping)
+    p = np.array([mapping[k] for k in keys], dtype=float)
+    return keys, p / p.sum()
+
+def _area_weights():
+    weights = {area: AREA_WEIGHTS.get(area, 0.6) for area in range(1, 78)}
+    return _weights(weights)
+
+def _centroids(seed):
+    """
+    A fixed pseudo-centroid per community area inside the city's bounding box.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.uniform(41.65, 42.02, 78), rng.uniform(-87.85, -87.52, 78)
+
+def _floor_to_quarter_hour(seconds):
+    # The portal publishes start/end times rounded to 15 minutes
+    return seconds - seconds % 900
+
+def _columns(n, offset, rng, centroid_lat, centroid_lon, start, days):
+    """
+    Draws one batch of clean trips, keyed by ChicagoTripRaw field name.
+    """
+    hours = rng.choice(24, n, p=np.array(HOUR_WEIGHTS) / sum(HOUR_WEIGHTS))
+    start_s = rng.integers(0, days, n) * 86400 + hours * 3600 + rng.integers(0, 3600, n)
+    trip_seconds = np.clip(rng.lognormal(np.log(720), 0.6, n), 61, 3 * 3600).round()
+    mph = np.clip(rng.lognormal(np.log(12), 0.35, n), 3, 45)
+    trip_miles = (trip_seconds / 3600 * mph).round(2)
+
+    areas, area_p = _area_weights()
+    pickup = rng.choice(areas, n, p=area_p)
+    dropoff = rng.choice(areas, n, p=area_p)
+    payment_keys, payment_p = _weights(PAYMENT_WEIGHTS)
+    payment = np.array(payment_keys)[rng.choice(len(payment_keys), n, p=payment_p)]
+    company_keys, company_p = _weights(COMPANY_WEIGHTS)
+
+    fare = (BASE_FARE + PER_MILE * trip_miles + PER_MINUTE * trip_seconds / 60 * rng.uniform(0, 1, n))
+    fare = (np.round(fare * 4) / 4).round(2)
+    card = np.isin(payment, ["Credit Card", "Mobile", "Prcard"])
+    tips = np.where(card & (rng.random(n) < 0.8), (fare * rng.uniform(0.1, 0.25, n)).round(2), 0.0)
+    tolls = np.where(rng.random(n) < 0.01, 4.0, 0.0)
+    extras = np.where(np.isin(pickup, AIRPORT_AREAS), 5.0, np.where(rng.random(n) < 0.1, 1.0, 0.0))
+
+    start_ts = (np.datetime64(start, "s") + _floor_to_quarter_hour(start_s).astype("timedelta64[s]"))
+    end_ts = start_ts + _floor_to_quarter_hour(trip_seconds.astype(np.int64) + 899).astype("timedelta64[s]")
+    start_ts, end_ts = start_ts.astype("datetime64[ms]"), end_ts.astype("datetime64[ms]")
+    return {
+        "trip_id": pl.int_range(offset, offset + n, eager=True),
+        "taxi_id": rng.integers(0, TAXI_POOL, n),
+        "trip_start_timestamp": start_ts,
+        "trip_end_timestamp": end_ts,
+        "trip_seconds": trip_seconds,
+        "trip_miles": trip_miles,
+        "pickup_community_area": pickup.astype(float),
+        "dropoff_community_area": dropoff.astype(float),
+        "fare": fare,
+        "tips": tips,
+        "tolls": tolls,
+        "extras": extras,
+        "trip_total": (fare + tips + tolls + extras).round(2),
+        "payment_type": payment,
+        "company": np.array(company_keys)[rng.choice(len(company_keys), n, p=company_p)],
+        "pickup_latitude": centroid_lat[pickup],
+        "pickup_longitude": centroid_lon[pickup],
+        "dropoff_latitude": centroid_lat[dropoff],
+        "dropoff_longitude": centroid_lon[dropoff],
+    }
+
+def _schema_columns():
+    """
+    The CSV columns (portal names) and Polars types, taken from ChicagoTripRaw.
+    """
+    columns = {}
+    for name, field in ChicagoTripRaw.model_fields.items():
+        types = [t for t in get_args(field.annotation) if t is not type(None)] or [field.annotation]
+        columns[name] = (field.alias or name, pl.Float64 if types[0] is float else pl.String)
+    return columns
+
+def _to_frame(values):
+    """
+    Formats generated values as the portal does and orders them by the schema.
+    Fails if the schema gained a field the generator does not produce.
+    """
+    schema = _schema_columns()
+    missing = set(schema) - set(values)
+    if missing:
+        raise ValueError(f"No generator for ChicagoTripRaw fields: {sorted(missing)}")
+
+    formatted = {
+        "trip_id": pl.format("syn{}", pl.col("trip_id").cast(pl.String).str.zfill(14)),
+        "taxi_id": pl.format("taxi{}", pl.col("taxi_id").cast(pl.String).str.zfill(5)),
+        "trip_start_timestamp": pl.col("trip_start_timestamp").dt.strftime(TIMESTAMP_FORMAT),
+        "trip_end_timestamp": pl.col("trip_end_timestamp").dt.strftime(TIMESTAMP_FORMAT),
+    }
+    return pl.DataFrame(values).select(
+        formatted.get(name, pl.col(name)).cast(dtype).alias(alias)
+        for name, (alias, dtype) in schema.items()
+    )
+
+def _inject_dirty(df, rng, rate):
+    """
+    Gives a share of rows one defect each that ingest or the Silver rules must reject.
+    """
+    n = len(df)
+    kinds = np.where(rng.random(n) < rate, rng.integers(0, len(DIRTY_KINDS), n), -1)
+    kind = pl.Series("kind", kinds)
+    short = pl.Series("short", rng.integers(5, 60, n).astype(float))
+
+    def when(name):
+        return pl.when(kind == DIRTY_KINDS.index(name))
+
+    return df.with_columns(
+        when("short_trip").then(short).otherwise(pl.col("trip_seconds")).alias("trip_seconds"),
+        when("zero_miles").then(0.0).otherwise(pl.col("trip_miles")).alias("trip_miles"),
+        when("negative_fare").then(-pl.col("fare")).otherwise(pl.col("fare")).alias("fare"),
+        when("missing_area").then(None).otherwise(pl.col("pickup_community_area"))
+        .alias("pickup_community_area"),
+        when("bad_timestamp").then(pl.lit("not a timestamp")).otherwise(pl.col("trip_start_timestamp"))
+        .alias("trip_start_timestamp"),
+        when("missing_id").then(None).otherwise(pl.col("trip_id")).alias("trip_id"),
+    )
+
+def iter_trip_batches(rows, seed=0, duplicate_rate=DUPLICATE_RATE, dirty_rate=DIRTY_RATE,
+                      batch_size=BATCH_SIZE, start=START, days=DAYS):
+    """
+    Generates synthetic raw trips shaped like the portal's CSV, batch by batch.
+    Args:
+        rows (int): Total rows to produce, duplicates included.
+        seed (int): Makes the output reproducible.
+        duplicate_rate (float): Share of rows that repeat a trip_id from the same batch.
+        dirty_rate (float): Share of rows carrying one defect (short trip, zero
+            miles, negative fare, missing area, unparseable timestamp, missing id).
+        batch_size (int): Rows per yielded batch.
+        start (datetime): First trip day; trips span `days` days from it.
+    Yields:
+        pl.DataFrame: One batch with the ChicagoTripRaw (portal) column names.
+    """
+    rng = np.random.default_rng(seed)
+    centroid_lat, centroid_lon = _centroids(seed)
+    offset = 0
+    produced = 0
+    while produced < rows:
+        size = min(batch_size, rows - produced)
+        dups = min(int(round(size * duplicate_rate)), size - 1)
+        unique = size - dups
+
+        batch = _to_frame(_columns(unique, offset, rng, centroid_lat, centroid_lon, start, days))
+        if dups:
+            batch = pl.concat([batch, batch.sample(dups, with_replacement=True, seed=int(rng.integers(2**31)))])
+        batch = _inject_dirty(batch, rng, dirty_rate).sample(fraction=1.0, shuffle=True,
+                                                            seed=int(rng.integers(2**31)))
+        offset += unique
+        produced += size
+        yield batch
+
+def generate_trips(rows, **kwargs):
+    """
+    Returns all generated rows as one DataFrame (see iter_trip_batches).
+    """
+    return pl.concat(list(iter_trip_batches(rows, **kwargs)))
+
+def write_trips_csv(rows, path=OUTPUT_FILE, **kwargs):
+    """
+    Streams generated rows to a CSV file, so memory stays bounded by the batch size.
+    Returns:
+        str: The CSV path.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        for i, batch in enumerate(iter_trip_batches(rows, **kwargs)):
+            batch.write_csv(f, include_header=i == 0)
+    logger.info(f"Wrote {rows} synthetic trips to {path} ({os.path.getsize(path) / 1024 ** 2:.1f} MB)")
+    return path
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Synthetic Chicago taxi trips")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--out", default=OUTPUT_FILE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duplicate-rate", type=float, default=DUPLICATE_RATE)
+    parser.add_argument("--dirty-rate", type=float, default=DIRTY_RATE)
+    args = parser.parse_args()
+    write_trips_csv(args.rows, args.out, seed=args.seed,
+                    duplicate_rate=args.duplicate_rate, dirty_rate=args.dirty_rate)
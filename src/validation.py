@@ -0,0 +1,202 @@
+import polars as pl
+import annotated_types
+from datetime import datetime
+from typing import Callable, NamedTuple, get_args
+
+# Python field types and the Polars types their columns are cast to
+POLARS_TYPES = {str: pl.String, int: pl.Int64, float: pl.Float64, datetime: pl.Datetime("us")}
+
+
+# ----------------------------------------------------------------
+# VECTORIZED VALIDATOR REGISTRY
+# ----------------------------------------------------------------
+VECTORIZED_VALIDATORS: dict[str, Callable[[pl.Expr], pl.Expr]] = {}
+
+def vectorized_validator(name):
+    """
+    Registers the columnar equivalent of a Pydantic field validator, by the
+    validator's method name. The function receives the (cast) column and
+    returns a boolean expression that is True for valid values.
+    """
+    def register(build):
+        VECTORIZED_VALIDATORS[name] = build
+        return build
+    return register
+
+@vectorized_validator("cost_must_be_positive")
+def _cost_must_be_positive(col):
+    return col >= 0
+
+
+# ----------------------------------------------------------------
+# MODEL COMPILATION
+# ----------------------------------------------------------------
+class Rule(NamedTuple):
+    """
+    One named check, e.g. "total_cost:cost_must_be_positive".
+    `valid` is a boolean expression over the cast columns, `raw` marks
+    rules evaluated on the columns before casting (type checks).
+    """
+    name: str
+    valid: pl.Expr
+    raw: bool = False
+
+class Conversion(NamedTuple):
+    """
+    How a model field's column is converted: its Python type and optionality.
+    The cast itself depends on the source dtype, so it is built per batch (bind()).
+    """
+    field: str
+    py_type: type
+    nullable: bool
+
+class CompiledModel(NamedTuple):
+    model: type
+    conversions: dict[str, Conversion]  # Silver column -> conversion
+    rules: list[Rule]  # Nullability, constraints and validators (type rules come from bind())
+    datetime_format: str | None = None
+
+def _field_type(annotation):
+    """
+    Returns (python type, nullable) for a field annotation such as Optional[int].
+    """
+    args = get_args(annotation)
+    if args:
+        types = [t for t in args if t is not type(None)]
+        return types[0], len(types) < len(args)
+    return annotation, False
+
+def _constraint_rules(field_name, col, metadata):
+    rules = []
+    for meta in metadata:
+        if isinstance(meta, annotated_types.Gt):
+            rules.append(Rule(f"{field_name}:gt", col > meta.gt))
+        elif isinstance(meta, annotated_types.Ge):
+            rules.append(Rule(f"{field_name}:ge", col >= meta.ge))
+        elif isinstance(meta, annotated_types.Lt):
+            rules.append(Rule(f"{field_name}:lt", col < meta.lt))
+        elif isinstance(meta, annotated_types.Le):
+            rules.append(Rule(f"{field_name}:le", col <= meta.le))
+        elif isinstance(meta, annotated_types.MinLen):
+            rules.append(Rule(f"{field_name}:min_length", col.str.len_chars() >= meta.min_length))
+        elif isinstance(meta, annotated_types.MaxLen):
+            rules.append(Rule(f"{field_name}:max_length", col.str.len_chars() <= meta.max_length))
+        elif getattr(meta, "pattern", None):
+            rules.append(Rule(f"{field_name}:pattern", col.str.contains(meta.pattern)))
+        else:
+            raise ValueError(f"Unsupported constraint on '{field_name}': {meta!r}")
+    return rules
+
+def compile_model(model, column_map, datetime_format=None):
+    """
+    Compiles a Pydantic model's field types, optionality, constraints and
+    field validators into Polars expressions, so whole batches are validated
+    at columnar speed with the model as the single source of truth.
+    Args:
+        model (type[BaseModel]): The model to enforce.
+        column_map (dict[str, str]): Model field name -> DataFrame column.
+        datetime_format (str): Format for parsing string columns of datetime fields.
+    Returns:
+        CompiledModel: Column conversions and named rules.
+    Raises:
+        ValueError: If a field is unmapped, a type or constraint is unsupported,
+            or a validator has no registered vectorized equivalent.
+    """
+    unmapped = set(model.model_fields) - set(column_map)
+    if unmapped:
+        raise ValueError(f"No column mapped for {model.__name__} fields: {sorted(unmapped)}")
+
+    conversions, rules = {}, []
+    for name, field in model.model_fields.items():
+        column = column_map[name]
+        py_type, nullable = _field_type(field.annotation)
+        if py_type not in POLARS_TYPES:
+            raise ValueError(f"Unsupported type for '{name}': {field.annotation}")
+        conversions[column] = Conversion(name, py_type, nullable)
+        if not nullable:
+            rules.append(Rule(f"{name}:not_null", pl.col(column).is_not_null(), raw=True))
+
+        rules += _constraint_rules(name, pl.col(column), field.metadata)
+
+    for validator_name, decorator in model.__pydantic_decorators__.field_validators.items():
+        build = VECTORIZED_VALIDATORS.get(validator_name)
+        if build is None:
+            raise ValueError(
+                f"{model.__name__}.{validator_name} has no vectorized equivalent; "
+                "register one with @vectorized_validator"
+            )
+        for name in decorator.info.fields:
+            rules.append(Rule(f"{name}:{validator_name}", build(pl.col(column_map[name]))))
+
+    if model.__pydantic_decorators__.model_validators:
+        raise ValueError(f"{model.__name__} model validators cannot be vectorized")
+    return CompiledModel(model, conversions, rules, datetime_format)
+
+def _cast(column, conversion, dtype, datetime_format):
+    """
+    The cast of one column from its source dtype. Only text is parsed with
+    the datetime format; other dtypes (e.g. an already parsed Datetime) are cast.
+    """
+    raw = pl.col(column)
+    if conversion.py_type is datetime and datetime_format and dtype == pl.String:
+        return raw.str.to_datetime(datetime_format, strict=False)
+    return raw.cast(POLARS_TYPES[conversion.py_type], strict=False)
+
+def bind(compiled, schema):
+    """
+    Builds the cast expressions and type rules of a compiled model for a
+    batch's source schema.
+    Returns:
+        tuple[dict[str, pl.Expr], list[Rule]]: Column -> cast, and one type rule per field.
+    """
+    casts, rules = {}, []
+    for column, conversion in compiled.conversions.items():
+        raw = pl.col(column)
+        cast = _cast(column, conversion, schema.get(column), compiled.datetime_format)
+        casts[column] = cast
+        # A present value that does not convert is a type error, not a missing value
+        type_ok = raw.is_null() | cast.is_not_null()
+        if conversion.py_type is int:
+            # Pydantic rejects fractional floats for int fields
+            type_ok = type_ok & (raw.cast(pl.Float64, strict=False).fill_null(0) % 1 == 0)
+        rules.append(Rule(f"{conversion.field}:type", type_ok, raw=True))
+    return casts, rules
+
+
+# ----------------------------------------------------------------
+# BATCH VALIDATION
+# ----------------------------------------------------------------
+def validate(df, compiled):
+    """
+    Casts the mapped columns and evaluates every rule on the whole batch.
+    Null values only fail the nullability rules, never constraints or validators.
+    Returns:
+        tuple[pl.DataFrame, pl.DataFrame]: Valid rows (cast), and rejected rows
+        as they were passed in (uncast, so bad values can be inspected) with a
+        `reasons` list column naming each failed rule.
+    """
+    casts, type_rules = bind(compiled, df.schema)
+    rules = type_rules + compiled.rules
+    checks = [pl.when(~rule.valid.fill_null(True)).then(pl.lit(rule.name)) for rule in rules if rule.raw]
+    checked = df.with_columns(pl.concat_list(checks).alias("reasons")) if checks else \
+        df.with_columns(pl.lit([], dtype=pl.List(pl.String)).alias("reasons"))
+    checked = checked.with_columns(**casts)
+
+    value_checks = [pl.when(~rule.valid.fill_null(True)).then(pl.lit(rule.name))
+                    for rule in rules if not rule.raw]
+    if value_checks:
+        checked = checked.with_columns(pl.concat_list([pl.col("reasons"), *value_checks]).alias("reasons"))
+    checked = checked.with_columns(pl.col("reasons").list.drop_nulls())
+
+    failed = pl.col("reasons").list.len() > 0
+    rejected = df.with_columns(checked["reasons"]).filter(failed)
+    return checked.filter(~failed).drop("reasons"), rejected
+
+def rule_counts(rejected):
+    """
+    Returns {rule name: rejected rows} for the rejected rows of validate().
+    """
+    if rejected.is_empty():
+        return {}
+    counts = rejected.select(pl.col("reasons").explode()).group_by("reasons").len()
+    return dict(counts.sort("len", descending=True).iter_rows())
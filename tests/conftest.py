@@ -0,0 +1,78 @@
+import bson
+import pytest
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+# Modules that open their own MongoClient(MONGO_URI)
+MONGO_MODULES = ["src.clean", "src.aggregate", "src.ingest"]
+
+
+def _find_raw_batches(self, filter=None, projection=None, batch_size=0, **kwargs):
+    """
+    mongomock has no raw-batch cursor; serve find() results as concatenated BSON.
+    """
+    docs = list(self.find(filter or {}, projection, **kwargs))
+    size = batch_size or 101
+    for i in range(0, len(docs), size):
+        yield b"".join(bson.encode(doc) for doc in docs[i:i + size])
+
+
+def _bulk_write(self, requests, ordered=True, **kwargs):
+    """
+    mongomock's bulk_write does not accept the operations of the installed
+    pymongo, so they are applied one at a time. Duplicate keys are reported
+    like MongoDB does, as a BulkWriteError after the remaining (unordered) ops.
+    """
+    counts = {"inserted_count": 0, "upserted_count": 0, "modified_count": 0, "deleted_count": 0}
+    errors = []
+    for index, op in enumerate(requests):
+        try:
+            _apply(self, op, counts)
+        except DuplicateKeyError as e:
+            errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+            if ordered:
+                break
+    if errors:
+        raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [],
+                              "nInserted": counts["inserted_count"], "nUpserted": counts["upserted_count"],
+                              "nModified": counts["modified_count"], "nRemoved": counts["deleted_count"]})
+    return type("BulkWriteResult", (), counts)()
+
+
+def _apply(self, op, counts):
+    if isinstance(op, InsertOne):
+        self.insert_one(op._doc)
+        counts["inserted_count"] += 1
+    elif isinstance(op, (UpdateOne, UpdateMany, ReplaceOne)):
+        if isinstance(op, ReplaceOne):
+            res = self.replace_one(op._filter, op._doc, upsert=op._upsert)
+        elif isinstance(op, UpdateOne):
+            res = self.update_one(op._filter, op._doc, upsert=op._upsert)
+        else:
+            res = self.update_many(op._filter, op._doc, upsert=op._upsert)
+        counts["upserted_count"] += res.upserted_id is not None
+        counts["modified_count"] += res.modified_count
+    elif isinstance(op, (DeleteOne, DeleteMany)):
+        delete = self.delete_one if isinstance(op, DeleteOne) else self.delete_many
+        counts["deleted_count"] += delete(op._filter).deleted_count
+
+
+@pytest.fixture
+def mongo(monkeypatch, tmp_path):
+    """
+    A mongomock client used by the pipeline modules in place of MongoDB.
+    The test runs in tmp_path, where the relative data/ paths are created.
+    Returns:
+        The pipeline database.
+    """
+    mongomock = pytest.importorskip("mongomock")
+    import importlib
+
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(mongomock.collection.Collection, "find_raw_batches", _find_raw_batches, raising=False)
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", _bulk_write)
+    for name in MONGO_MODULES:
+        module = importlib.import_module(name)
+        monkeypatch.setattr(module, "MongoClient", lambda *args, **kwargs: client)
+    monkeypatch.chdir(tmp_path)
+    return client[importlib.import_module("src.clean").DB_NAME]
@@ -0,0 +1,198 @@
+from datetime import datetime
+
+import polars as pl
+from polars.testing import assert_frame_equal
+from src.aggregate import GOLD_METRICS, PARTIAL_STATES, partial_aggregates
+
+
+def _silver():
+    return pl.LazyFrame({
+        "trip_start_timestamp": [datetime(2024, 1, 1, 8), datetime(2024, 1, 1, 8), datetime(2024, 1, 2, 17)],
+        "fare": [10.0, 20.0, 30.0],
+        "duration_min": [10.0, 20.0, 30.0],
+        "trip_total": [12.0, 24.0, 36.0],
+        "payment_type": ["Cash", "Credit Card", "Cash"],
+        "pickup_community_area": [8, 8, 32],
+        "dropoff_community_area": [32, 32, 8],
+        "company": ["Flash Cab", "Sun Taxi", "Flash Cab"],
+        "pickup_centroid_latitude": [41.8990, 41.8991, 41.8810],
+        "pickup_centroid_longitude": [-87.6330, -87.6331, -87.6300],
+        "dropoff_centroid_latitude": [41.8810, 41.8810, None],
+        "dropoff_centroid_longitude": [-87.6300, -87.6300, None],
+    })
+
+
+# Test Case 1: Every registered Gold metric runs over one shared scan
+def test_gold_metrics_collect_together():
+    """
+    Verifies that all declared metrics can be executed in a single
+    collect_all call and produce the dashboard-facing columns.
+    """
+    silver = _silver()
+    results = dict(zip(
+        [m.collection for m in GOLD_METRICS],
+        pl.collect_all([m.build(silver) for m in GOLD_METRICS]),
+    ))
+
+    hourly = results["gold_hourly_stats"]
+    assert hourly.columns == ["hour", "trip_count", "avg_fare", "avg_duration"]
+    assert hourly.row(0) == (8, 2, 15.0, 15.0)
+    assert results["gold_payment_stats"]["payment_type"].to_list() == ["Cash", "Credit Card"]
+    assert results["gold_area_stats"]["pickup_community_area"].to_list() == [8, 32]
+    assert results["gold_od_areas"].row(0) == (8, 32, 2, 15.0, 15.0)
+    # Both 8 -> 32 trips fall into one pair of grid cells; the trip without
+    # dropoff coordinates has no cell and is left out
+    grid = results["gold_od_grid"]
+    assert grid["trip_count"].to_list() == [2]
+    assert grid.select("pickup_lat", "pickup_lon").row(0) == (41.895, -87.635)
+
+
+# Test Case 2: Partials from separate batches merge to the full-history result
+def test_partial_state_merges_across_batches():
+    """
+    Verifies that summing per-batch partial state and deriving the dashboard
+    view gives the same answer as aggregating all rows at once.
+    """
+    silver = _silver().collect()
+    for state in [s for s in PARTIAL_STATES if s.derive is not None]:
+        batches = [partial_aggregates(part.lazy(), state).collect() for part in silver.iter_slices(2)]
+        merged = (
+            pl.concat(batches)
+            .group_by(state.keys)
+            .agg(
+                pl.col("^.*_min$").min(),
+                pl.col("^.*_max$").max(),
+                pl.all().exclude(state.keys).exclude("^.*_(min|max)$").sum(),
+            )
+        )
+        whole = partial_aggregates(silver.lazy(), state).collect()
+
+        derived = state.derive(merged.lazy()).collect()
+        expected = state.derive(whole.lazy()).collect()
+        assert derived.sort(derived.columns).equals(expected.sort(expected.columns))
+
+
+def _silver_batch(counts, batch_id, fare_offset):
+    """
+    Silver rows with `counts[area]` trips picked up in each community area.
+    """
+    rows = []
+    for area, n in counts.items():
+        for i in range(n):
+            rows.append({
+                "trip_id": f"{batch_id}-{area}-{i}",
+                "trip_start_timestamp": datetime(2024, 1, 1 + i % 2, (area + i) % 24),
+                "fare": fare_offset + area + i * 0.5,
+                "duration_min": 5.0 + i,
+                "trip_total": fare_offset + area + i,
+                "payment_type": ["Cash", "Credit Card", "Mobile"][i % 3],
+                "pickup_community_area": area,
+                "dropoff_community_area": 1 + (area + i) % 5,
+                "company": ["Flash Cab", "Sun Taxi"][area % 2],
+                "pickup_centroid_latitude": 41.80 + area / 100,
+                "pickup_centroid_longitude": -87.70 + i / 100,
+                "dropoff_centroid_latitude": 41.85,
+                "dropoff_centroid_longitude": -87.65,
+                "silver_batch": batch_id,
+            })
+    return pl.DataFrame(rows)
+
+def _snapshot(db, collection, keys=None):
+    from src.aggregate import MERGED_BATCH_FIELD
+    df = pl.DataFrame(list(db[collection].find({}, {"_id": 0, MERGED_BATCH_FIELD: 0})))
+    return df.select(sorted(df.columns)).sort(keys or sorted(df.columns))
+
+def _load_silver(db, df, batch_id, mode):
+    """
+    Writes a Silver batch and advances the Silver watermark like clean.py does.
+    """
+    from src.aggregate import SILVER_WATERMARK_ID
+    from src.silver_store import write_silver
+    write_silver(df, mode=mode)
+    db.pipeline_state.update_one(
+        {"_id": SILVER_WATERMARK_ID}, {"$set": {"batch": batch_id, "generation": "g1"}}, upsert=True)
+
+def _assert_matches_full_build(db):
+    """
+    Snapshots the merged state, targets and sketches, rebuilds Gold from
+    scratch and checks that every collection comes out the same.
+    """
+    from src.aggregate import aggregate_gold_metrics, MERGED_BATCH_FIELD
+    from src.sketch import SKETCH_COLLECTION
+
+    def sketches():
+        return sorted(db[SKETCH_COLLECTION].find({}, {MERGED_BATCH_FIELD: 0}), key=lambda d: d["_id"])
+
+    targets = {state.target: None for state in PARTIAL_STATES if state.target}
+    states = {state.collection: state.keys for state in PARTIAL_STATES}
+    merged = {c: _snapshot(db, c, keys) for c, keys in {**targets, **states}.items()}
+    merged_sketches = sketches()
+
+    aggregate_gold_metrics()
+    for collection, keys in {**targets, **states}.items():
+        full = _snapshot(db, collection, keys)
+        assert_frame_equal(merged[collection], full, check_dtypes=False, check_exact=False)
+    assert merged_sketches == sketches()
+    return merged
+
+# Test Case 3: Upsert-merged state in MongoDB matches a full build
+def test_incremental_merge_matches_full_build(mongo):
+    """
+    Verifies that merging a second Silver batch into the stored state with
+    $inc/$min/$max/$setOnInsert upserts (_merge_partials) derives the same
+    dashboard collections, top-10 areas included, as a full build over both
+    batches. The second batch reverses the area ranking of the first.
+    """
+    from bson import ObjectId
+    from src.aggregate import aggregate_gold_metrics, GOLD_WATERMARK_ID
+
+    first, second = str(ObjectId()), str(ObjectId())
+    _load_silver(mongo, _silver_batch({area: area for area in range(1, 16)}, first, 0.0), first, "overwrite")
+    aggregate_gold_metrics(incremental=True)
+    _load_silver(mongo, _silver_batch({area: 2 * (16 - area) for area in range(1, 16)}, second, 3.0),
+                 second, "append")
+    aggregate_gold_metrics(incremental=True)
+    assert mongo.pipeline_state.find_one({"_id": GOLD_WATERMARK_ID})["batch"] == second
+
+    merged = _assert_matches_full_build(mongo)
+
+    areas = merged["gold_area_stats"]
+    assert len(areas) == 10
+    assert sorted(areas["pickup_community_area"]) == list(range(1, 11))
+
+# Test Case 4: A merge that failed midway can be rerun without double counting
+def test_interrupted_merge_is_idempotent(mongo, monkeypatch):
+    """
+    Verifies that rerunning an incremental merge that failed after part of
+    the state was updated skips the documents that already hold the batch,
+    finishes the interrupted batch before a newer one, and ends up with the
+    state, dashboard collections and sketches of a full build.
+    """
+    import pytest
+    from bson import ObjectId
+    import src.aggregate as aggregate
+
+    first, second, third = str(ObjectId()), str(ObjectId()), str(ObjectId())
+    _load_silver(mongo, _silver_batch({area: area for area in range(1, 16)}, first, 0.0), first, "overwrite")
+    aggregate.aggregate_gold_metrics(incremental=True)
+    _load_silver(mongo, _silver_batch({area: 16 - area for area in range(1, 16)}, second, 3.0),
+                 second, "append")
+
+    merge_partials = aggregate._merge_partials
+    def fail_after_first(collection, partials, state, batch):
+        merge_partials(collection, partials, state, batch)
+        raise RuntimeError("connection lost")
+    monkeypatch.setattr(aggregate, "_merge_partials", fail_after_first)
+    with pytest.raises(RuntimeError):
+        aggregate.aggregate_gold_metrics(incremental=True)
+    monkeypatch.setattr(aggregate, "_merge_partials", merge_partials)
+    mark = mongo.pipeline_state.find_one({"_id": aggregate.GOLD_WATERMARK_ID})
+    assert (mark["batch"], mark["pending"]) == (first, second)
+
+    # Silver moves on before the rerun
+    _load_silver(mongo, _silver_batch({area: 2 * area for area in range(1, 16)}, third, 5.0), third, "append")
+    aggregate.aggregate_gold_metrics(incremental=True)
+    mark = mongo.pipeline_state.find_one({"_id": aggregate.GOLD_WATERMARK_ID})
+    assert mark["batch"] == third and "pending" not in mark
+
+    _assert_matches_full_build(mongo)
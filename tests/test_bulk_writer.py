@@ -0,0 +1,67 @@
+import threading
+import time
+import polars as pl
+import pytest
+from pymongo.errors import BulkWriteError
+from src.bulk_writer import BulkWriter, bulk_insert
+
+
+class FakeCollection:
+    """
+    Stands in for a collection with a unique trip_id index and tracks how
+    many insert_many calls run at once.
+    """
+    name = "fake"
+
+    def __init__(self, fail_code=11000):
+        self.ids = set()
+        self.fail_code = fail_code
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def insert_many(self, docs, ordered=True):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+            errors = []
+            for i, doc in enumerate(docs):
+                if doc["trip_id"] in self.ids:
+                    errors.append({"index": i, "code": self.fail_code})
+                else:
+                    self.ids.add(doc["trip_id"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+        return type("Result", (), {"inserted_ids": [d["trip_id"] for d in docs]})()
+
+# Test Case 1: Concurrent batches are bounded and counted exactly
+def test_counts_inserts_and_duplicates_with_bounded_concurrency():
+    """
+    Verifies that duplicates are counted rather than fatal when ignored,
+    inserts add up across batches, and no more than `workers` requests run at once.
+    """
+    collection = FakeCollection()
+    df = pl.DataFrame({"trip_id": [f"t{i % 900}" for i in range(1000)]})
+
+    result = bulk_insert(collection, df, batch_size=50, workers=3, max_pending=3, ignore_duplicates=True)
+
+    assert (result.batches, result.inserted, result.duplicates, result.errors) == (20, 900, 100, 0)
+    assert 1 < collection.max_active <= 3
+
+# Test Case 2: Other write errors fail after all batches finished
+def test_non_duplicate_errors_raise_with_complete_counts():
+    """
+    Verifies that a non-duplicate write error is raised on exit, and only
+    after the remaining batches have been written and counted.
+    """
+    collection = FakeCollection(fail_code=121)  # Document failed validation
+    collection.ids.add("t0")
+
+    with pytest.raises(BulkWriteError):
+        with BulkWriter(collection, batch_size=10, workers=2) as writer:
+            writer.write_records([{"trip_id": f"t{i}"} for i in range(100)])
+
+    assert (writer.result.inserted, writer.result.errors) == (99, 1)
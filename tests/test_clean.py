@@ -0,0 +1,119 @@
+import polars as pl
+from src.clean import clean_and_load_silver, WATERMARK_ID
+from src.silver_store import scan_silver
+
+
+def _bronze(trip_ids, day=1):
+    """
+    Bronze documents as ingested from the portal CSV, all passing the Silver rules.
+    """
+    return [
+        {
+            "trip_id": trip_id, "taxi_id": "cab-1",
+            "trip_start_timestamp": f"2024-01-{day:02d}T08:{i:02d}:00.000",
+            "trip_end_timestamp": f"2024-01-{day:02d}T08:{i + 15:02d}:00.000",
+            "trip_seconds": 900.0, "trip_miles": 2.5, "fare": 12.0, "tips": None, "tolls": 0.0,
+            "extras": 0.0, "trip_total": 14.0, "payment_type": "Cash", "company": "Flash Cab",
+            "pickup_community_area": 8.0, "dropoff_community_area": 32.0,
+        }
+        for i, trip_id in enumerate(trip_ids)
+    ]
+
+
+# Test Case 1: An incremental run only cleans and appends Bronze documents after the watermark
+def test_incremental_silver_appends_only_new_rows(mongo):
+    """
+    Verifies that a second incremental run reads only the documents inserted
+    since the first, appends them to both Silver copies, advances the _id
+    watermark and drops a trip_id that Silver already holds.
+    """
+    mongo.raw_trips.insert_many(_bronze(["a", "b", "c"]))
+    first = clean_and_load_silver(incremental=True)
+    mark = mongo.pipeline_state.find_one({"_id": WATERMARK_ID})
+    assert sorted(first["trip_id"]) == ["a", "b", "c"]
+    assert mark["last_id"] == mongo.raw_trips.find_one(sort=[("_id", -1)])["_id"]
+
+    # Two new trips and a re-delivered one
+    mongo.raw_trips.insert_many(_bronze(["d", "e", "b"], day=2))
+    second = clean_and_load_silver(incremental=True)
+    new_mark = mongo.pipeline_state.find_one({"_id": WATERMARK_ID})
+
+    assert sorted(second["trip_id"]) == ["d", "e"]
+    assert new_mark["last_id"] == mongo.raw_trips.find_one(sort=[("_id", -1)])["_id"]
+    assert new_mark["last_id"] > mark["last_id"]
+    # Appending keeps the generation, so Gold can update incrementally
+    assert new_mark["generation"] == mark["generation"]
+
+    silver = scan_silver().collect()
+    assert sorted(silver["trip_id"]) == ["a", "b", "c", "d", "e"]
+    assert silver.filter(pl.col("trip_id") == "b")["silver_batch"].item() == str(mark["last_id"])
+    assert mongo.silver_trips.count_documents({}) == 5
+    assert mongo.silver_trips.count_documents({"trip_id": "b"}) == 1
+
+    # Nothing new: the watermark stays and Silver is untouched
+    assert clean_and_load_silver(incremental=True) is None
+    assert scan_silver().collect().height == 5
+
+
+# Test Case 2: A run that failed after writing Silver can be repeated
+def test_retried_append_does_not_duplicate_silver(mongo, monkeypatch):
+    """
+    Verifies that when an incremental run fails after both Silver copies
+    were written but before the watermark moved, the rerun rewrites the
+    batch's Parquet files and skips its documents already in MongoDB.
+    """
+    import pytest
+    import src.clean as clean
+
+    mongo.raw_trips.insert_many(_bronze(["a", "b"]))
+    clean_and_load_silver(incremental=True)
+    mongo.raw_trips.insert_many(_bronze(["c", "d"], day=2))
+
+    def crash(plan):
+        raise RuntimeError("crash before the watermark is saved")
+    commit_silver = clean.commit_silver
+    monkeypatch.setattr(clean, "commit_silver", crash)
+    with pytest.raises(RuntimeError):
+        clean_and_load_silver(incremental=True)
+    monkeypatch.setattr(clean, "commit_silver", commit_silver)
+
+    retried = clean_and_load_silver(incremental=True)
+    assert sorted(retried["trip_id"]) == ["c", "d"]
+    assert sorted(scan_silver().collect()["trip_id"]) == ["a", "b", "c", "d"]
+    assert mongo.silver_trips.count_documents({}) == 4
+
+
+# Test Case 3: Rejected rows are quarantined batch by batch
+def test_quarantine_is_written_per_batch(mongo, monkeypatch):
+    """
+    Verifies that each read batch's rejected rows are written as soon as the
+    batch is validated, that the per-rule counts add up over the batches,
+    and that a full run replaces the quarantine instead of adding to it.
+    """
+    import src.clean as clean
+    from src.bulk_writer import BulkWriter
+
+    docs = _bronze([f"t{i}" for i in range(9)])
+    for doc in docs[::3]:
+        doc["fare"] = -1.0
+    docs[4]["pickup_community_area"] = None
+    mongo.raw_trips.insert_many(docs)
+
+    written = []
+    write_frame = BulkWriter.write_frame
+    def spy(writer, df):
+        if writer.collection.name.startswith(clean.QUARANTINE_COLLECTION):
+            written.append(len(df))
+        write_frame(writer, df)
+    monkeypatch.setattr(BulkWriter, "write_frame", spy)
+    monkeypatch.setattr(clean, "READ_BATCH_SIZE", 2)
+
+    clean_and_load_silver()
+    state = mongo.pipeline_state.find_one({"_id": clean.QUARANTINE_ID})
+    assert sum(written) == 4 and len(written) > 1
+    assert state["rejected"] == 4
+    assert sum(state["rules"].values()) >= 4
+    assert mongo[clean.QUARANTINE_COLLECTION].count_documents({}) == 4
+
+    clean_and_load_silver()
+    assert mongo[clean.QUARANTINE_COLLECTION].count_documents({}) == 4
@@ -0,0 +1,93 @@
+from datetime import date, datetime
+
+import polars as pl
+import pytest
+from src.aggregate import PARTIAL_STATES, partial_aggregates
+from src.cube import query_cube, query_silver
+
+mongomock = pytest.importorskip("mongomock")
+
+FILTERS = [
+    {},
+    {"start": date(2024, 1, 2), "end": date(2024, 1, 3)},
+    {"companies": ["Flash Cab"]},
+    {"payment_types": ["Cash", "Mobile"]},
+    {"areas": [8, 32, 76]},
+    {"start": date(2024, 1, 2), "end": date(2024, 1, 2), "companies": ["Sun Taxi"],
+     "payment_types": ["Credit Card"], "areas": [8, 28]},
+]
+
+
+def _silver():
+    """
+    Silver rows over four days, 3 companies, 3 payment types and 8 areas
+    (fewer than TOP_AREAS, so the area view is never cut off).
+    """
+    areas = [8, 28, 32, 76, 6, 7, 24, 3]
+    return pl.DataFrame([
+        {
+            "trip_id": f"t{i}",
+            "trip_start_timestamp": datetime(2024, 1, 1 + i % 4, (i * 7) % 24, i % 60),
+            "fare": 5.0 + (i * 37 % 100) / 4,
+            "duration_min": 3.0 + (i * 13 % 50) / 2,
+            "trip_total": 7.0 + (i * 37 % 100) / 4,
+            "payment_type": ["Cash", "Credit Card", "Mobile"][i % 3],
+            "company": ["Flash Cab", "Sun Taxi", "City Service"][i // 5 % 3],
+            "pickup_community_area": areas[i // 2 % len(areas)],
+        }
+        for i in range(400)
+    ])
+
+def _expected(silver, start=None, end=None, companies=None, payment_types=None, areas=None):
+    """
+    The dashboard views computed directly over the Silver rows in Polars.
+    """
+    df = silver
+    if start is not None:
+        df = df.filter(pl.col("trip_start_timestamp").dt.date() >= start)
+    if end is not None:
+        df = df.filter(pl.col("trip_start_timestamp").dt.date() <= end)
+    for column, values in (("company", companies), ("payment_type", payment_types),
+                           ("pickup_community_area", areas)):
+        if values:
+            df = df.filter(pl.col(column).is_in(values))
+    hourly = df.group_by(pl.col("trip_start_timestamp").dt.hour().alias("hour")).agg(
+        pl.len().alias("trip_count"), pl.col("fare").mean().alias("avg_fare"),
+        pl.col("duration_min").mean().alias("avg_duration"),
+    )
+    payment = df.group_by("payment_type").agg(
+        pl.len().alias("count"), pl.col("trip_total").mean().alias("avg_cost"))
+    area = df.group_by("pickup_community_area").agg(
+        pl.len().alias("trip_count"), pl.col("fare").mean().alias("avg_fare"))
+    return {"hourly": (hourly, "hour"), "payment": (payment, "payment_type"),
+            "area": (area, "pickup_community_area")}
+
+def _assert_views(views, expected):
+    for view, (df, key) in expected.items():
+        rows = sorted(views[view], key=lambda r: r[key])
+        want = df.sort(key).to_dicts()
+        assert [r[key] for r in rows] == [w[key] for w in want], view
+        for row, w in zip(rows, want):
+            for field, value in w.items():
+                assert row[field] == pytest.approx(value, abs=0.01), (view, field)
+    counts = [r["trip_count"] for r in views["area"]]
+    assert counts == sorted(counts, reverse=True)
+
+# Test Case 1: Cube queries match the same filters applied to Silver
+@pytest.mark.parametrize("filters", FILTERS)
+def test_query_cube_matches_silver(filters):
+    """
+    Verifies that the filter-to-$match translation and the $facet views of
+    query_cube (over the Gold cube) and query_silver (over silver_trips)
+    give the views Polars computes from the filtered Silver rows.
+    """
+    db = mongomock.MongoClient().db
+    silver = _silver()
+    cube = next(s for s in PARTIAL_STATES if s.collection == "gold_cube")
+    db.gold_cube.insert_many(partial_aggregates(silver.lazy(), cube).collect().to_dicts())
+    db.silver_trips.insert_many(silver.to_dicts())
+
+    expected = _expected(silver, **filters)
+    assert expected["hourly"][0]["trip_count"].sum() > 0
+    _assert_views(query_cube(db, **filters), expected)
+    _assert_views(query_silver(db, **filters), expected)
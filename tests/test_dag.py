@@ -0,0 +1,94 @@
+import threading
+from src.dag import Stage, run_dag
+
+
+def _write(path, text):
+    def run(upstream):
+        with open(path, "w") as f:
+            f.write(text)
+    return run
+
+# Test Case 1: Independent stages run at the same time
+def test_independent_stages_run_concurrently(tmp_path):
+    """
+    Verifies that two stages sharing only an upstream are in flight together
+    (the barrier only releases once both have started).
+    """
+    barrier = threading.Barrier(2, timeout=5)
+    stages = [
+        Stage("source", lambda upstream: 1),
+        Stage("left", lambda upstream: barrier.wait() + upstream["source"], after=("source",)),
+        Stage("right", lambda upstream: barrier.wait() + upstream["source"], after=("source",)),
+    ]
+
+    status = run_dag(stages, state_file=str(tmp_path / "state.json"))
+
+    assert status == {"source": "ran", "left": "ran", "right": "ran"}
+
+# Test Case 2: Unchanged inputs are skipped and failures resume downstream
+def test_skip_unchanged_and_resume_failed_stage(tmp_path):
+    """
+    Verifies that a rerun after a downstream failure reuses the source and
+    the upstream stage, and retries only the failed stage.
+    """
+    raw, clean = tmp_path / "raw.csv", tmp_path / "clean.csv"
+    calls = {"source": 0, "clean": 0, "gold": 0}
+    broken = {"gold": True}
+
+    def count(name, run=None):
+        def stage(upstream):
+            calls[name] += 1
+            if run:
+                run(upstream)
+        return stage
+
+    def gold(upstream):
+        calls["gold"] += 1
+        if broken["gold"]:
+            raise RuntimeError("Mongo unavailable")
+
+    stages = [
+        Stage("source", count("source", _write(raw, "a,b")), outputs=(f"file:{raw}",)),
+        Stage("clean", count("clean", _write(clean, "a")), after=("source",),
+              inputs=(f"file:{raw}",), outputs=(f"file:{clean}",)),
+        Stage("gold", gold, after=("clean",), inputs=(f"file:{clean}",)),
+    ]
+    state_file = str(tmp_path / "state.json")
+
+    assert run_dag(stages, state_file=state_file)["gold"] == "failed"
+
+    broken["gold"] = False
+    status = run_dag(stages, state_file=state_file)
+
+    assert status == {"source": "skipped", "clean": "skipped", "gold": "ran"}
+    assert calls == {"source": 1, "clean": 1, "gold": 2}
+
+# Test Case 3: Directories are fingerprinted from file metadata
+def test_dir_fingerprint_uses_file_metadata(tmp_path, monkeypatch):
+    """
+    Verifies that a directory fingerprint is stable while nothing changes,
+    changes when a file is added or rewritten, and never reads file contents.
+    """
+    import os
+    import src.dag as dag
+
+    def no_reads(path, digest):
+        raise AssertionError(f"read {path}")
+    monkeypatch.setattr(dag, "_hash_file", no_reads)
+
+    root = tmp_path / "silver" / "day=1"
+    root.mkdir(parents=True)
+    (root / "part-a.parquet").write_bytes(b"a" * 10)
+    artifact = f"dir:{tmp_path / 'silver'}"
+    first = dag._fingerprint(artifact, None)
+    assert dag._fingerprint(artifact, None) == first
+
+    (root / "part-b.parquet").write_bytes(b"b")
+    added = dag._fingerprint(artifact, None)
+    assert added != first
+
+    # Same size, new mtime (e.g. a batch's part file written again)
+    stat = os.stat(root / "part-b.parquet")
+    os.utime(root / "part-b.parquet", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert dag._fingerprint(artifact, None) not in (first, added)
+    assert dag._fingerprint(f"dir:{tmp_path / 'missing'}", None) is None
@@ -0,0 +1,22 @@
+import polars as pl
+from src.dedup import TripIdSet
+
+# Test Case 1: Batches are deduplicated against every earlier batch
+def test_trip_id_set_catches_history_duplicates(tmp_path):
+    """
+    Verifies that trip_ids added by earlier runs are found again after the
+    set is reopened from disk, and that new ids pass through.
+    """
+    TripIdSet(str(tmp_path / "ids")).add([f"trip{i}" for i in range(5000)])
+
+    id_set = TripIdSet(str(tmp_path / "ids"))
+    batch = pl.DataFrame({"trip_id": [f"trip{i}" for i in range(4000, 6000)]})
+    new_rows, duplicates = id_set.filter_new(batch)
+
+    assert duplicates == 1000
+    assert new_rows["trip_id"].to_list() == [f"trip{i}" for i in range(5000, 6000)]
+    assert len(id_set) == 5000
+
+    id_set.add(new_rows["trip_id"].to_list() + ["trip0"])
+    assert len(id_set) == 6000
+    assert id_set.rebuild([batch]) == 2000
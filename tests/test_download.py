@@ -0,0 +1,221 @@
+import os
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import polars as pl
+import pytest
+from src.download_data import (
+    download_incremental, commit_incremental, download_partitioned, _load_state, CsvStream
+)
+
+HEADER = "trip_id,trip_start_timestamp,fare\n"
+
+
+def _make_rows(start, count):
+    return [
+        (f"t{i:04d}", f"2024-01-01T{i // 60:02d}:{i % 60:02d}:00.000", f"{i}.50")
+        for i in range(start, start + count)
+    ]
+
+
+class FakePortal:
+    """
+    Minimal local stand-in for the Socrata CSV endpoint.
+    Honours $where (timestamp > 'X', >= 'X' or a >= / < range), $limit and $offset
+    on a sorted row set.
+    """
+    def __init__(self, rows, header=HEADER):
+        self.rows = rows
+        self.header = header
+        self.requests = []
+        self.fail_at_offset = None
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                portal.requests.append(params)
+                offset = int(params.get("$offset", 0))
+                if portal.fail_at_offset == offset:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                rows = sorted(portal.rows, key=lambda r: (r[1], r[0]))
+                if "$where" in params:
+                    marks = params["$where"].split("'")[1::2]
+                    if len(marks) == 1 and ">=" in params["$where"]:
+                        rows = [r for r in rows if r[1] >= marks[0]]
+                    elif len(marks) == 1:
+                        rows = [r for r in rows if r[1] > marks[0]]
+                    else:
+                        rows = [r for r in rows if marks[0] <= r[1] < marks[1]]
+                rows = rows[offset:offset + int(params.get("$limit", len(rows)))]
+                body = (portal.header + "".join(",".join(r) + "\n" for r in rows)).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/resource.csv"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def portal():
+    server = FakePortal(_make_rows(0, 25))
+    yield server
+    server.server.shutdown()
+
+
+def _write_state(path, watermark):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('{"watermark": "%s"}' % watermark)
+
+
+# Test Case 1: Only rows from the watermark on are fetched, page by page
+def test_incremental_fetches_new_rows_in_pages(portal, tmp_path):
+    state_file = tmp_path / "state" / "download_state.json"
+    _write_state(state_file, "2024-01-01T00:09:00.000")
+
+    pages = download_incremental(base_url=portal.url, page_size=6,
+                                 output_dir=str(tmp_path / "pages"), state_file=str(state_file))
+
+    # The watermark row and 15 new rows -> pages of 6, 6, 4
+    assert len(pages) == 3
+    assert [int(r["$offset"]) for r in portal.requests] == [0, 6, 12]
+    commit_incremental(str(state_file))
+    assert _load_state(str(state_file))["watermark"] == "2024-01-01T00:24:00.000"
+
+
+# Test Case 2: An interrupted page sequence resumes where it stopped
+def test_incremental_resumes_after_failure(portal, tmp_path):
+    state_file = tmp_path / "state" / "download_state.json"
+    _write_state(state_file, "2024-01-01T00:09:00.000")
+    kwargs = dict(base_url=portal.url, page_size=6,
+                  output_dir=str(tmp_path / "pages"), state_file=str(state_file))
+
+    portal.fail_at_offset = 12
+    assert download_incremental(**kwargs) is None
+    # The watermark must not move on a failed run
+    assert _load_state(str(state_file))["watermark"] == "2024-01-01T00:09:00.000"
+
+    portal.fail_at_offset = None
+    portal.requests.clear()
+    pages = download_incremental(**kwargs)
+    assert [int(r["$offset"]) for r in portal.requests] == [12]
+    assert len(pages) == 3
+
+
+# Test Case 3: A row published late with the watermark timestamp is not lost
+def test_incremental_refetches_the_watermark_timestamp(portal, tmp_path):
+    """
+    Verifies that a row stamped with the stored watermark but published after
+    the run that set it is fetched by the next run, and that the re-fetched
+    watermark rows are skipped on ingest instead of duplicated.
+    """
+    mongomock = pytest.importorskip("mongomock")
+    from src.indexes import create_declared_indexes
+    from src.ingest import _ingest_eager
+
+    collection = mongomock.MongoClient().db.raw_trips
+    create_declared_indexes(collection, "raw_trips")
+    state_file = tmp_path / "state" / "download_state.json"
+    _write_state(state_file, "2024-01-01T00:09:00.000")
+    kwargs = dict(base_url=portal.url, page_size=50,
+                  output_dir=str(tmp_path / "pages"), state_file=str(state_file))
+
+    _ingest_eager(download_incremental(**kwargs), collection, append=True)
+    commit_incremental(str(state_file))
+    assert _load_state(str(state_file))["watermark"] == "2024-01-01T00:24:00.000"
+
+    portal.rows.append(("late", "2024-01-01T00:24:00.000", "9.50"))
+    read, inserted = _ingest_eager(download_incremental(**kwargs), collection, append=True)
+    assert (read, inserted) == (2, 1)
+    assert collection.count_documents({}) == 17
+    assert collection.count_documents({"trip_id": "late"}) == 1
+
+
+# Test Case 4: Partitions are fetched concurrently and only missing ones are retried
+def test_partitioned_download_refetches_only_missing(portal, tmp_path):
+    kwargs = dict(base_url=portal.url, partition_hours=0.1, max_workers=3,
+                  output_dir=str(tmp_path / "parts"),
+                  manifest_file=str(tmp_path / "state" / "manifest.json"))
+    start, end = datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 1, 0, 30)
+
+    files = download_partitioned(start, end, **kwargs)
+    # 30 minutes in 6-minute partitions; rows exist for minutes 0-24 only
+    assert len(portal.requests) == 5
+    assert len(files) == 5
+
+    os.remove(files[2])
+    portal.requests.clear()
+    assert download_partitioned(start, end, **kwargs) == files
+    assert len(portal.requests) == 1
+
+
+# Test Case 5: A partition holding more rows than a page is fetched in full
+def test_partition_is_paged(portal, tmp_path):
+    """
+    Verifies that a partition larger than the page size is fetched page by
+    page with $offset into one CSV with a single header, rather than cut off
+    at one response's $limit.
+    """
+    files = download_partitioned(datetime(2024, 1, 1), datetime(2024, 1, 2), base_url=portal.url,
+                                 output_dir=str(tmp_path / "parts"), page_size=10,
+                                 manifest_file=str(tmp_path / "state" / "manifest.json"))
+
+    assert [r["$offset"] for r in portal.requests] == ["0", "10", "20"]
+    df = pl.read_csv(files[0], infer_schema=False)
+    assert df["trip_id"].to_list() == [f"t{i:04d}" for i in range(25)]
+    assert not os.path.exists(f"{files[0]}.page")
+
+
+# Test Case 6: A streamed download arrives as row-aligned batches
+def test_stream_yields_row_aligned_batches(portal, tmp_path):
+    raw_copy = tmp_path / "raw" / "raw_data.csv"
+    # ~40 bytes per row, so chunk boundaries fall mid-row
+    stream = CsvStream(portal.url, raw_copy=str(raw_copy), chunk_bytes=100, queue_batches=1)
+    batches = list(stream)
+
+    assert len(batches) > 1
+    df = pl.concat(batches)
+    assert df["trip_id"].to_list() == [f"t{i:04d}" for i in range(25)]
+    assert df.schema["fare"] == pl.Float64
+    assert df["fare"].sum() == sum(i + 0.5 for i in range(25))
+    # The optional raw copy holds exactly the bytes received
+    assert raw_copy.stat().st_size == stream.bytes_read
+    assert pl.read_csv(raw_copy)["trip_id"].len() == 25
+
+
+# Test Case 7: A consumer that stops early releases the download thread
+def test_stream_stops_with_consumer(portal):
+    stream = CsvStream(portal.url, chunk_bytes=50, queue_batches=1)
+    for _ in stream:
+        break
+    assert not any(t.name == "csv-stream" for t in threading.enumerate())
+
+
+# Test Case 8: Every streamed batch has the same schema
+def test_stream_batches_share_schema(tmp_path):
+    """
+    Verifies that a column outside RAW_SCHEMA is read as text in every
+    batch, even when its values look numeric in the first chunks, so the
+    batches can be concatenated and inserted alike.
+    """
+    rows = [(*row, str(i) if i < 20 else f"tract-{i}") for i, row in enumerate(_make_rows(0, 25))]
+    server = FakePortal(rows, header="trip_id,trip_start_timestamp,fare,census_tract\n")
+    try:
+        batches = list(CsvStream(server.url, chunk_bytes=100, queue_batches=1))
+    finally:
+        server.server.shutdown()
+
+    assert len(batches) > 1
+    assert {df.schema["census_tract"] for df in batches} == {pl.String}
+    assert {df.schema["fare"] for df in batches} == {pl.Float64}
+    assert pl.concat(batches)["census_tract"].to_list()[-1] == "tract-24"
@@ -0,0 +1,66 @@
+from datetime import date, datetime
+
+import polars as pl
+import pytest
+from src.export import export_name, export_query, export_silver
+from src.silver_store import write_silver
+
+
+@pytest.fixture
+def silver_root(tmp_path):
+    root = str(tmp_path / "silver")
+    write_silver(pl.DataFrame({
+        "trip_id": ["a", "b", "c", "d"],
+        "trip_start_timestamp": [datetime(2024, 1, 1, 8), datetime(2024, 1, 2, 9),
+                                 datetime(2024, 1, 3, 10), datetime(2024, 1, 3, 11)],
+        "fare": [10.0, 20.0, 30.0, 40.0],
+        "payment_type": ["Cash", "Credit Card", "Cash", "Cash"],
+        "company": ["Flash Cab", "Sun Taxi", "Flash Cab", "Sun Taxi"],
+        "pickup_community_area": [8, 8, 32, 8],
+    }), mode="overwrite", root=root)
+    return root
+
+
+# Test Case 1: Filters and the inclusive date range select the matching trips
+def test_export_query_applies_filters(silver_root):
+    lf = export_query(start=date(2024, 1, 2), end=date(2024, 1, 3), payment_types=["Cash"],
+                      areas=[8], root=silver_root)
+    df = lf.collect()
+    assert df["trip_id"].to_list() == ["d"]
+    # Partition keys are an artifact of the storage layout, not part of the extract
+    assert "year" not in df.columns
+
+
+# Test Case 2: Every format round-trips the same rows through the streaming sinks
+@pytest.mark.parametrize("fmt,reader", [
+    ("parquet", pl.read_parquet), ("ipc", pl.read_ipc), ("csv", pl.read_csv),
+])
+def test_export_formats(silver_root, tmp_path, fmt, reader):
+    path = str(tmp_path / "out" / f"extract.{fmt}")
+    result = export_silver(path, fmt, companies=["Flash Cab"], columns=["trip_id", "fare"],
+                           root=silver_root)
+
+    assert result["rows"] == 2
+    assert sorted(reader(path)["trip_id"].to_list()) == ["a", "c"]
+
+
+# Test Case 3: An empty selection writes nothing
+def test_export_without_matches(silver_root, tmp_path):
+    result = export_silver(str(tmp_path / "x.parquet"), start=date(2023, 1, 1), end=date(2023, 1, 2),
+                           root=silver_root)
+    assert result["rows"] == 0 and result["path"] is None
+
+
+# Test Case 4: Concurrent exports get their own files
+def test_export_names_are_unique(silver_root, tmp_path):
+    """
+    Verifies that two exports with the same filters get distinct file names
+    and leave no temporary files behind.
+    """
+    names = {export_name("csv", date(2024, 1, 1), date(2024, 1, 3)) for _ in range(2)}
+    assert len(names) == 2
+    assert all(n.startswith("silver_trips_2024-01-01_2024-01-03_") and n.endswith(".csv") for n in names)
+
+    for name in names:
+        export_silver(str(tmp_path / "out" / name), "csv", root=silver_root)
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == sorted(names)
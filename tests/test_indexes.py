@@ -0,0 +1,17 @@
+from src.indexes import classify_plan
+
+# Test Case 1: explain() winning plans are classified by their stages
+def test_classify_plan_stages():
+    """
+    Verifies that index-only plans are reported as covered, index scans with a
+    document fetch as indexed, and anything else as a collection scan.
+    """
+    covered = {"queryPlanner": {"winningPlan": {
+        "stage": "PROJECTION_COVERED", "inputStage": {"stage": "IXSCAN"}}}}
+    indexed = {"queryPlanner": {"winningPlan": {
+        "stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}}
+    scanned = {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}
+
+    assert classify_plan(covered) == "COVERED"
+    assert classify_plan(indexed) == "INDEXED"
+    assert classify_plan(scanned) == "COLLSCAN"
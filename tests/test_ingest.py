@@ -0,0 +1,39 @@
+import polars as pl
+import pytest
+from src.ingest import _ingest_eager, _ingest_streaming
+from src.synthetic import write_trips_csv
+
+mongomock = pytest.importorskip("mongomock")
+
+
+def _documents(collection, exclude=()):
+    docs = collection.find({"trip_id": {"$nin": list(exclude)}}, {"_id": 0})
+    return sorted(docs, key=lambda d: d["trip_id"])
+
+# Test Case 1: Streaming in small batches loads the same documents as one eager load
+def test_streaming_ingest_matches_eager(tmp_path):
+    """
+    Verifies that the batched streaming mode inserts exactly the rows and
+    documents of the eager mode, with rows missing a trip_id dropped and
+    re-delivered trips skipped by the unique index in both. Copies of a
+    re-delivered trip can differ (defects are injected per row), and which
+    one lands first is up to the concurrent writers, so those trips are only
+    compared by id.
+    """
+    path = write_trips_csv(500, str(tmp_path / "trips.csv"), seed=5, duplicate_rate=0.05,
+                           dirty_rate=0.2, batch_size=128)
+    client = mongomock.MongoClient()
+    eager_col, streamed_col = client.eager.raw_trips, client.streamed.raw_trips
+
+    eager = _ingest_eager([path], eager_col)
+    streamed = _ingest_streaming([path], streamed_col, batch_size=37)
+
+    assert eager == streamed
+    read, inserted = eager
+    assert 0 < inserted < read < 500
+    assert eager_col.count_documents({}) == streamed_col.count_documents({}) == inserted
+    redelivered = (pl.read_csv(path, infer_schema=False)["trip_id"].value_counts()
+                   .filter(pl.col("count") > 1)["trip_id"].to_list())
+    assert sorted(eager_col.distinct("trip_id")) == sorted(streamed_col.distinct("trip_id"))
+    assert _documents(eager_col, redelivered) == _documents(streamed_col, redelivered)
+    assert eager_col.count_documents({"trip_id": None}) == 0
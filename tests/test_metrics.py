@@ -0,0 +1,51 @@
+import time
+from types import SimpleNamespace
+from src.metrics import PipelineRun, track_stage, record, export_prometheus, _MongoLatencyListener
+
+# Test Case 1: Stage counters, Mongo latency and Prometheus export
+def test_track_stage_records_counters_and_mongo_latency(tmp_path):
+    """
+    Verifies that counters set inside a stage, and Mongo commands issued on
+    its thread, end up in that stage's metrics and in the textfile export.
+    """
+    listener = _MongoLatencyListener()
+    run = PipelineRun()
+
+    with track_stage("silver_mongo") as stage:
+        record(rows_in=100, rows_out=90)
+        listener.succeeded(SimpleNamespace(command_name="insert", duration_micros=4000))
+        listener.succeeded(SimpleNamespace(command_name="find", duration_micros=1000))
+    run.add(stage)
+    # Outside a stage, commands are not attributed to anything
+    listener.succeeded(SimpleNamespace(command_name="insert", duration_micros=9000))
+
+    metrics = stage.to_dict()
+    assert metrics["status"] == "success"
+    assert (metrics["rows_in"], metrics["rows_out"]) == (100, 90)
+    assert metrics["mongo_bulk_write"]["count"] == 1
+    assert metrics["mongo_bulk_write"]["total_ms"] == 4.0
+    assert metrics["mongo_round_trip"]["count"] == 1
+
+    path = tmp_path / "pipeline.prom"
+    export_prometheus(run, str(path))
+    text = path.read_text()
+    assert 'chicago_pipeline_stage_rows_out{stage="silver_mongo"} 90' in text
+    assert 'chicago_pipeline_stage_mongo_bulk_write_seconds_sum{stage="silver_mongo"} 0.004' in text
+
+# Test Case 2: Peak memory is measured per stage, not per process
+def test_stage_peak_rss_is_per_stage():
+    """
+    Verifies that a stage allocating memory reports a higher peak than a
+    light stage after it, while the process high-water mark is shared.
+    """
+    with track_stage("heavy") as heavy:
+        block = b"x" * (200 * 1024 ** 2)
+        time.sleep(0.3)
+        del block
+    with track_stage("light") as light:
+        time.sleep(0.1)
+
+    assert heavy.peak_rss_mb - light.peak_rss_mb > 100
+    assert abs(heavy.rss_delta_mb) < 100
+    # The process high-water mark still carries the heavy stage
+    assert light.process_peak_rss_mb - light.peak_rss_mb > 100
@@ -0,0 +1,42 @@
+import bson
+import polars as pl
+import pytest
+from src.mongo_reader import decode_raw_batch, iter_frames
+
+# Test Case 1: Raw BSON batches decode into typed columns
+def test_decode_raw_batch_builds_columns():
+    """
+    Verifies that a raw cursor batch is decoded column by column, keeping
+    only the requested fields and filling absent keys with nulls.
+    """
+    docs = [
+        {"trip_id": "a", "fare": 10, "company": "Flash Cab", "extra": 1},
+        {"trip_id": "b", "fare": 12.5},
+    ]
+    raw_batch = b"".join(bson.encode(d) for d in docs)
+
+    df = decode_raw_batch(raw_batch, ["trip_id", "fare", "company"])
+
+    assert df.columns == ["trip_id", "fare", "company"]
+    assert df.schema["fare"] == pl.Float64
+    assert df["company"].to_list() == ["Flash Cab", None]
+
+# Test Case 2: Both reader backends stream the same frames
+def test_arrow_backend_matches_bson_backend(mongo):
+    """
+    Verifies that the pymongoarrow backend (the `arrow` extra) pages through
+    a filtered collection into the same frames as the raw BSON backend.
+    """
+    pytest.importorskip("pymongoarrow")
+    mongo.raw_trips.insert_many([
+        {"trip_id": f"t{i}", "fare": i + 0.5, "company": "Flash Cab" if i % 3 == 0 else None, "extra": i}
+        for i in range(10)
+    ])
+    columns, query = ["trip_id", "fare", "company"], {"fare": {"$gte": 1}}
+
+    arrow = list(iter_frames(mongo.raw_trips, columns, query, batch_size=4, backend="arrow",
+                             arrow_schema={"trip_id": str, "fare": float, "company": str}))
+    raw = list(iter_frames(mongo.raw_trips, columns, query, batch_size=4))
+
+    assert [len(df) for df in arrow] == [4, 4, 1]
+    assert pl.concat(arrow).equals(pl.concat(raw))
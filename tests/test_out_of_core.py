@@ -0,0 +1,76 @@
+import os
+from datetime import datetime
+
+import polars as pl
+from src.aggregate import GOLD_METRICS, PARTIAL_STATES, merge_partials, month_partials, partial_aggregates
+from src.clean import _finish_month
+from src.out_of_core import map_months, pool_size, stage_batch, staged_months
+from src.silver_store import silver_months, write_silver
+
+
+def _silver():
+    starts = [datetime(2024, 1, 5, 8), datetime(2024, 1, 20, 9), datetime(2024, 2, 3, 8),
+              datetime(2024, 2, 3, 17), datetime(2024, 3, 1, 0)]
+    return pl.DataFrame({
+        "trip_id": ["a", "b", "c", "d", "e"],
+        "trip_start_timestamp": starts,
+        "fare": [10.0, 20.0, 30.0, 40.0, 50.0],
+        "duration_min": [5.0, 10.0, 15.0, 20.0, 25.0],
+        "trip_total": [12.0, 24.0, 36.0, 48.0, 60.0],
+        "payment_type": ["Cash", "Cash", "Credit Card", "Cash", "Mobile"],
+        "pickup_community_area": [8, 8, 32, 8, 76],
+        "dropoff_community_area": [32, 32, 8, 8, 8],
+        "company": ["Flash Cab", "Sun Taxi", "Flash Cab", "Flash Cab", "Sun Taxi"],
+        "pickup_centroid_latitude": [41.8990, 41.8991, 41.8810, 41.8990, 41.9800],
+        "pickup_centroid_longitude": [-87.6330, -87.6331, -87.6300, -87.6330, -87.6600],
+        "dropoff_centroid_latitude": [41.8810, 41.8810, 41.8990, 41.8990, 41.8990],
+        "dropoff_centroid_longitude": [-87.6300, -87.6300, -87.6330, -87.6330, -87.6330],
+    })
+
+
+# Test Case 1: The memory budget decides how many month workers run
+def test_pool_size_follows_budget():
+    assert pool_size(budget_mb=512, worker_mb=1024) == 1
+    assert pool_size(budget_mb=4096, worker_mb=1024) == min(os.cpu_count(), 4)
+
+
+# Test Case 2: Month partials from the process pool merge to the whole-history result
+def test_month_partials_match_full_build(tmp_path):
+    """
+    Verifies that Gold built from per-month partials (computed in worker
+    processes with the streaming engine) equals Gold computed in one pass.
+    """
+    root = str(tmp_path / "silver")
+    silver = _silver()
+    write_silver(silver, mode="overwrite", root=root)
+
+    months = silver_months(root=root)
+    assert [m[0].month for m in months] == [1, 2, 3]
+    by_month = map_months(month_partials, months, root=root)
+
+    for i, state in enumerate(PARTIAL_STATES):
+        merged = merge_partials([r[i] for r in by_month], state)
+        whole = partial_aggregates(silver.lazy(), state).collect()
+        assert merged.columns == whole.columns
+        assert merged.sort(state.keys).equals(whole.sort(state.keys))
+
+    hourly = next(s for s in PARTIAL_STATES if s.target == "gold_hourly_stats")
+    derived = hourly.derive(merge_partials([r[0] for r in by_month], hourly).lazy()).collect()
+    direct = next(m for m in GOLD_METRICS if m.collection == "gold_hourly_stats").build(silver.lazy()).collect()
+    assert derived.equals(direct)
+
+
+# Test Case 3: Staged months are deduplicated into one sorted file each
+def test_staged_months_are_deduplicated(tmp_path):
+    root = str(tmp_path / "staging")
+    silver = _silver()
+    stage_batch(silver, root=root)
+    stage_batch(silver.filter(pl.col("trip_id") == "c"), root=root)  # re-delivered trip
+
+    results = [_finish_month(month, batch_id="b1") for month in staged_months(root)]
+
+    assert [r["rows"] for r in results] == [2, 2, 1]
+    assert results[1]["staged"] == 3
+    february = pl.read_parquet(results[1]["path"])
+    assert february["trip_id"].to_list() == ["c", "d"]
+    assert february["silver_batch"].unique().to_list() == ["b1"]
@@ -0,0 +1,90 @@
+import pytest
+from src.publish import publish, generations, generations_kept, rollback, GENERATIONS_KEPT
+
+mongomock = pytest.importorskip("mongomock")
+
+# Test Case 1: A refresh swaps in whole and keeps the old version
+def test_publish_swaps_and_rolls_back():
+    """
+    Verifies that readers see the old documents until the staging collection
+    is swapped in, that a failed refresh leaves the collection untouched,
+    and that rollback restores the previous generation.
+    """
+    db = mongomock.MongoClient().db
+    db.gold_hourly_stats.insert_many([{"hour": h} for h in range(24)])
+
+    with publish(db, "gold_hourly_stats", keep=1) as staging:
+        staging.insert_many([{"hour": h, "v": 2} for h in range(3)])
+        assert db.gold_hourly_stats.count_documents({}) == 24
+
+    assert db.gold_hourly_stats.count_documents({"v": 2}) == 3
+    assert "hour" in db.gold_hourly_stats.index_information()
+    assert len(generations(db, "gold_hourly_stats")) == 1
+
+    with pytest.raises(RuntimeError):
+        with publish(db, "gold_hourly_stats", keep=1) as staging:
+            staging.insert_one({"hour": 0})
+            raise RuntimeError("aggregation failed")
+    assert db.gold_hourly_stats.count_documents({}) == 3
+    assert "gold_hourly_stats__staging" not in db.list_collection_names()
+
+    rollback(db, "gold_hourly_stats")
+    assert db.gold_hourly_stats.count_documents({}) == 24
+    assert generations(db, "gold_hourly_stats") == []
+
+# Test Case 2: The live collection exists throughout the swap
+def test_swap_never_leaves_the_collection_missing(monkeypatch):
+    """
+    Verifies that the only rename of a publish replaces the live collection
+    in place (it still exists when the staging collection is renamed over it),
+    and that the rollback copy keeps the old documents.
+    """
+    db = mongomock.MongoClient().db
+    db.gold_cube.insert_many([{"v": 1} for _ in range(5)])
+    seen = []
+    rename = mongomock.collection.Collection.rename
+
+    def spy(self, new_name, **kwargs):
+        seen.append((self.name, new_name, new_name in db.list_collection_names()))
+        return rename(self, new_name, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "rename", spy)
+    with publish(db, "gold_cube", keep=1) as staging:
+        staging.insert_many([{"v": 2} for _ in range(2)])
+
+    assert seen == [("gold_cube__staging", "gold_cube", True)]
+    assert db.gold_cube.count_documents({"v": 2}) == 2
+    assert db[generations(db, "gold_cube")[0]].count_documents({"v": 1}) == 5
+
+# Test Case 3: Generations are only copied when rollback is asked for
+def test_generations_kept_per_collection(monkeypatch):
+    """
+    Verifies that the large collections are published without a rollback
+    copy by default, that an explicit keep snapshots the live collection,
+    and that rollback rebuilds the declared indexes.
+    """
+    db = mongomock.MongoClient().db
+    assert generations_kept("raw_trips") == generations_kept("silver_trips") == 0
+    assert generations_kept("gold_cube") == GENERATIONS_KEPT
+
+    copies = []
+    aggregate = mongomock.collection.Collection.aggregate
+    def spy(self, pipeline, *args, **kwargs):
+        copies.append(self.name)
+        return aggregate(self, pipeline, *args, **kwargs)
+    monkeypatch.setattr(mongomock.collection.Collection, "aggregate", spy)
+
+    for _ in range(2):
+        with publish(db, "raw_trips") as staging:
+            staging.insert_one({"trip_id": "a"})
+        with publish(db, "silver_trips") as staging:
+            staging.insert_one({"trip_id": "a"})
+    assert copies == []
+    assert generations(db, "raw_trips") == generations(db, "silver_trips") == []
+
+    with publish(db, "silver_trips", keep=1) as staging:
+        staging.insert_one({"trip_id": "b"})
+    assert copies == ["silver_trips"]
+    rollback(db, "silver_trips")
+    assert db.silver_trips.find_one({}, {"_id": 0}) == {"trip_id": "a"}
+    assert "trip_id_unique" in db.silver_trips.index_information()
@@ -0,0 +1,36 @@
+import polars as pl
+from src.clean import validate_batch
+from src.models import ChicagoTripRaw
+from src.schemas import RAW_SCHEMA, SILVER_SCHEMA, conform, matches
+from src.synthetic import generate_trips
+
+
+# Test Case 1: The Bronze schema covers every portal column
+def test_raw_schema_matches_model():
+    """
+    Verifies that the CSV is read with a declared type for every
+    ChicagoTripRaw column, so nothing is left to inference.
+    """
+    assert set(RAW_SCHEMA) == {f.alias for f in ChicagoTripRaw.model_fields.values()}
+    assert RAW_SCHEMA["payment_type"] == pl.Categorical
+
+
+# Test Case 2: Cleaned batches come out in the compact Silver types
+def test_silver_batches_use_registry_types():
+    """
+    Verifies that validated rows carry exactly the declared Silver types,
+    with money kept to the cent, and that out-of-range areas are rejected
+    rather than overflowing the small integer type.
+    """
+    df = generate_trips(200, seed=1, duplicate_rate=0.0, dirty_rate=0.0).with_columns(
+        pl.col("fare") + 0.004,
+        pl.when(pl.int_range(pl.len()) == 0).then(500.0).otherwise(pl.col("pickup_community_area"))
+        .alias("pickup_community_area"),
+    )
+    valid, rejected = validate_batch(conform(df, RAW_SCHEMA, strict=False))
+
+    assert matches(valid.schema, SILVER_SCHEMA)
+    assert valid.schema["company"] == pl.Categorical
+    assert valid.schema["trip_seconds"] == pl.Int32
+    assert (valid["fare"] * 100 - (valid["fare"] * 100).round()).abs().max() < 1e-6
+    assert rejected["reasons"].to_list() == [["pickup_area:le"]]
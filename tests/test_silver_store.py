@@ -0,0 +1,67 @@
+from datetime import date, datetime
+
+import polars as pl
+from src.silver_store import write_silver, scan_silver, compact_partitions
+
+
+def _silver_rows(trip_ids, day):
+    return pl.DataFrame({
+        "trip_id": trip_ids,
+        "trip_start_timestamp": [datetime(2024, 1, day, 8)] * len(trip_ids),
+        "fare": [10.0] * len(trip_ids),
+    })
+
+
+# Test Case 1: Date-bounded scans only read the matching day partitions
+def test_scan_silver_prunes_partitions(tmp_path):
+    root = str(tmp_path / "silver")
+    write_silver(pl.concat([_silver_rows(["a", "b"], 1), _silver_rows(["c"], 2)]),
+                 mode="overwrite", root=root)
+
+    df = scan_silver(date(2024, 1, 2), date(2024, 1, 3), root=root).collect()
+
+    assert df["trip_id"].to_list() == ["c"]
+    assert df["day"].to_list() == [2]
+
+
+# Test Case 2: Replacing a day swaps only that partition
+def test_replace_mode_rewrites_single_partition(tmp_path):
+    root = str(tmp_path / "silver")
+    write_silver(pl.concat([_silver_rows(["a", "b"], 1), _silver_rows(["c"], 2)]),
+                 mode="overwrite", root=root)
+
+    write_silver(_silver_rows(["z"], 2), mode="replace", root=root)
+
+    ids = scan_silver(root=root).collect()["trip_id"].sort().to_list()
+    assert ids == ["a", "b", "z"]
+
+
+# Test Case 3: Compaction merges appended files without losing rows
+def test_compaction_merges_small_files(tmp_path):
+    root = str(tmp_path / "silver")
+    for trip_id in ["a", "b", "c"]:
+        write_silver(_silver_rows([trip_id], 1), mode="append", root=root)
+
+    assert compact_partitions(root=root) == 1
+
+    partition = tmp_path / "silver" / "year=2024" / "month=1" / "day=1"
+    assert len(list(partition.glob("*.parquet"))) == 1
+    assert scan_silver(root=root).collect().height == 3
+
+
+# Test Case 4: Appending the same batch again replaces its files
+def test_append_same_batch_is_idempotent(tmp_path):
+    """
+    Verifies that a retried append of one Silver batch overwrites the part
+    files named after it, while another batch adds its own.
+    """
+    root = str(tmp_path / "silver")
+    rows = pl.concat([_silver_rows(["a", "b"], 1), _silver_rows(["c"], 2)])
+    write_silver(rows, mode="append", root=root, batch="b1")
+    write_silver(rows, mode="append", root=root, batch="b1")
+    write_silver(_silver_rows(["d"], 2), mode="append", root=root, batch="b2")
+
+    ids = scan_silver(root=root).collect()["trip_id"].sort().to_list()
+    assert ids == ["a", "b", "c", "d"]
+    partition = tmp_path / "silver" / "year=2024" / "month=1" / "day=2"
+    assert sorted(p.name for p in partition.iterdir()) == ["part-b1.parquet", "part-b2.parquet"]
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import polars as pl
+from src.sketch import RELATIVE_ACCURACY, merge, quantile, sketch_documents, sketch_partials
+
+
+def _silver(n, seed):
+    rng = np.random.default_rng(seed)
+    return pl.LazyFrame({
+        "trip_start_timestamp": [datetime(2024, 1, 1) + timedelta(minutes=int(m)) for m in rng.integers(0, 2880, n)],
+        "fare": np.round(rng.lognormal(np.log(15), 0.8, n), 2),
+        "duration_min": np.round(rng.lognormal(np.log(12), 0.6, n), 2),
+    })
+
+# Test Case 1: Merged daily sketches answer quantiles within the accuracy bound
+def test_merged_sketches_match_exact_quantiles():
+    """
+    Verifies that sketches built from separate batches, merged per hour and
+    across days, give p50/p90/p99 within the relative accuracy of the exact values.
+    """
+    batches = [_silver(20_000, seed) for seed in range(3)]
+    docs = [doc for b in batches for doc in sketch_documents(sketch_partials(b, "hour").collect(), "hour")]
+
+    all_trips = pl.concat([b.collect() for b in batches])
+    hour = 8
+    exact = all_trips.filter(pl.col("trip_start_timestamp").dt.hour() == hour)["fare"]
+    sketch = merge(doc["fare"] for doc in docs if doc["key"] == hour)
+
+    assert sum(sketch.values()) == len(exact)
+    for q in (0.5, 0.9, 0.99):
+        expected = exact.quantile(q, interpolation="lower")
+        assert abs(quantile(sketch, q) - expected) <= expected * RELATIVE_ACCURACY + 0.01
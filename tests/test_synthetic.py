@@ -0,0 +1,23 @@
+from src.models import ChicagoTripRaw
+from src.clean import clean_batch
+from src.synthetic import generate_trips
+
+# Test Case 1: Generated rows follow the raw schema and inject the requested defects
+def test_generated_trips_match_schema_and_rates():
+    """
+    Verifies that synthetic batches use the portal column names from
+    ChicagoTripRaw, repeat trip_ids at the duplicate rate, and that the
+    Silver rules reject the dirty rows.
+    """
+    df = generate_trips(10_000, seed=1, duplicate_rate=0.05, dirty_rate=0.0, batch_size=4_000)
+
+    aliases = [f.alias for f in ChicagoTripRaw.model_fields.values()]
+    assert df.columns == aliases
+    assert len(df) == 10_000
+    assert df["trip_id"].n_unique() == 10_000 - 500
+    assert len(clean_batch(df)) == 10_000
+
+    dirty = generate_trips(10_000, seed=1, duplicate_rate=0.0, dirty_rate=0.3)
+    rejected = 10_000 - len(clean_batch(dirty.drop_nulls(subset=["trip_id"])))
+    # Every defect kind is dropped here (missing ids at ingest, the rest by clean_batch)
+    assert 2_700 < rejected < 3_300
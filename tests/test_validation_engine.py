@@ -0,0 +1,116 @@
+import polars as pl
+import pytest
+from pydantic import BaseModel, ValidationError, field_validator
+from src.clean import validate_batch, SILVER_COLUMN_MAP
+from src.models import ChicagoTripClean
+from src.synthetic import generate_trips
+from src.validation import compile_model, validate, rule_counts
+
+def _model_accepts(row):
+    """
+    Validates one raw row with ChicagoTripClean, mapped as the Silver step maps it.
+    """
+    seconds = row["trip_seconds"]
+    data = {field: row[column] for field, column in SILVER_COLUMN_MAP.items() if column in row}
+    data["duration_min"] = None if seconds is None else round(seconds / 60, 2)
+    try:
+        ChicagoTripClean.model_validate(data)
+        return True
+    except ValidationError:
+        return False
+
+# Test Case 1: Vectorized checks report each defect by rule name
+def test_batch_validation_reports_rules():
+    """
+    Verifies that each defect is caught by the rule compiled from
+    ChicagoTripClean and reported by name, and that clean rows are typed.
+    """
+    df = generate_trips(6, seed=3, duplicate_rate=0.0, dirty_rate=0.0).with_columns(
+        pl.Series("trip_seconds", [30.0, 600.0, 600.0, 600.0, 600.0, 600.0]),
+        pl.Series("fare", [10.0, -1.0, 10.0, 10.0, 10.0, 10.0]),
+        pl.Series("pickup_community_area", [8.0, 8.0, None, 8.5, 8.0, 8.0]),
+        pl.Series("trip_start_timestamp", ["2024-01-01T00:00:00.000"] * 4 + ["not a timestamp"] * 1
+                  + ["2024-01-01T00:00:00.000"]),
+    )
+
+    valid, rejected = validate_batch(df)
+
+    assert len(valid) == 1
+    assert valid.schema["pickup_community_area"] == pl.Int8
+    assert valid.schema["trip_start_timestamp"] == pl.Datetime("us")
+    assert rejected["reasons"].to_list() == [
+        ["duration_min:gt"], ["fare:ge"], ["pickup_area:not_null"],
+        ["pickup_area:type"], ["start_time:type"],
+    ]
+    assert rule_counts(rejected)["fare:ge"] == 1
+
+# Test Case 2: The batch checks accept exactly the rows the Pydantic model accepts
+def test_batch_validation_matches_model():
+    """
+    Verifies that validate_batch and ChicagoTripClean.model_validate, run row
+    by row, accept and reject the same rows of a dirty synthetic sample.
+    """
+    df = generate_trips(2000, seed=11, dirty_rate=0.3).with_row_index("row")
+
+    valid, rejected = validate_batch(df)
+    expected = {row["row"] for row in df.iter_rows(named=True) if _model_accepts(row)}
+
+    assert 0 < len(expected) < len(df)
+    assert set(valid["row"]) == expected
+    assert set(rejected["row"]) == set(df["row"]) - expected
+
+# Test Case 3: Already parsed timestamps are cast, not re-parsed as text
+def test_datetime_columns_pass_validation():
+    """
+    Verifies that Datetime columns (e.g. Bronze documents stored with BSON
+    dates) validate like their text form instead of failing the type rule.
+    """
+    df = generate_trips(200, seed=4, duplicate_rate=0.0, dirty_rate=0.0)
+    parsed = df.with_columns(
+        pl.col("trip_start_timestamp", "trip_end_timestamp").str.to_datetime("%Y-%m-%dT%H:%M:%S%.f"))
+
+    valid_text, _ = validate_batch(df)
+    valid_parsed, rejected = validate_batch(parsed)
+
+    assert rejected.is_empty()
+    assert valid_parsed.equals(valid_text)
+
+# Test Case 4: Rejected rows keep the values that failed
+def test_rejected_rows_keep_raw_values():
+    """
+    Verifies that quarantined rows carry the original (uncast) values, so an
+    unparsable timestamp or a fractional area can be inspected.
+    """
+    df = generate_trips(2, seed=3, duplicate_rate=0.0, dirty_rate=0.0).with_columns(
+        pl.Series("trip_start_timestamp", ["not a timestamp", "2024-01-01T00:00:00.000"]),
+        pl.Series("pickup_community_area", [8.0, 8.5]),
+    )
+
+    _, rejected = validate_batch(df)
+
+    assert rejected["reasons"].to_list() == [["start_time:type"], ["pickup_area:type"]]
+    assert rejected["trip_start_timestamp"].to_list() == ["not a timestamp", "2024-01-01T00:00:00.000"]
+    assert rejected["pickup_community_area"].to_list() == [8.0, 8.5]
+
+# Test Case 5: Validators without a vectorized equivalent are refused
+def test_unregistered_validator_fails_compilation():
+    """
+    Verifies that compiling a model fails loudly instead of silently skipping
+    a field validator that has no columnar version.
+    """
+    class Trip(BaseModel):
+        trip_id: str
+
+        @field_validator("trip_id")
+        @classmethod
+        def id_must_be_upper(cls, v):
+            return v
+
+    with pytest.raises(ValueError, match="id_must_be_upper"):
+        compile_model(Trip, {"trip_id": "trip_id"})
+
+    class Plain(BaseModel):
+        trip_id: str
+
+    _, rejected = validate(pl.DataFrame({"trip_id": ["a", None]}), compile_model(Plain, {"trip_id": "trip_id"}))
+    assert rejected["reasons"].to_list() == [["trip_id:not_null"]]